@@ -7,14 +7,16 @@ __version__ = "0.1.0"
 __author__ = "Diego Programmer"
 
 from nexaflow.agent import Agent
-from nexaflow.tools import Tool, ToolRegistry
-from nexaflow.memory import Memory
+from nexaflow.tools import AsyncTool, Tool, ToolRegistry
+from nexaflow.memory import Memory, MemoryManager
 from nexaflow.orchestrator import Orchestrator
 
 __all__ = [
     "Agent",
     "Tool",
+    "AsyncTool",
     "ToolRegistry",
     "Memory",
+    "MemoryManager",
     "Orchestrator",
 ]
@@ -0,0 +1,71 @@
+"""
+Optional speedups for NexaFlow
+Uses fast C libraries when installed, standard library otherwise
+"""
+
+import json
+import re
+import sys
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+try:
+    import re2
+except ImportError:  # google-re2 is optional
+    re2 = None
+
+
+# @dataclass(**DATACLASS_SLOTS) drops the per-instance __dict__ on 3.10+
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def json_dumps(
+    obj: Any,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+    indent: bool = False
+) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes (compact, or 2-space indented)
+    default converts unsupported objects; orjson encodes dataclasses
+    natively and only falls back to it for other types
+    """
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(
+        obj,
+        sort_keys=sort_keys,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        ensure_ascii=False,
+        default=default
+    ).encode("utf-8")
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def regex_compile(pattern: str) -> Any:
+    """
+    Compile a pattern with RE2 (linear time, no catastrophic backtracking)
+    when google-re2 is installed, stdlib re otherwise
+    Patterns must stay RE2-compatible: inline flags such as (?i), no
+    lookarounds or backreferences, and \\w treated as ASCII-only
+    """
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except re2.error:
+            pass  # unsupported by RE2 - use the backtracking engine
+    return re.compile(pattern)
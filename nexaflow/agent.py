@@ -3,18 +3,213 @@ NexaFlow Agent Core
 The brain of the system - implements ReAct (Reasoning + Acting) pattern
 """
 
+import ast
+import asyncio
+import hashlib
 import json
-import re
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Any, Tuple
+from dataclasses import dataclass, field
 
-from .llm import LLMClient
-from .memory import MemoryManager, MemoryItem
+from ._compat import DATACLASS_SLOTS, json_loads, regex_compile
+from .cache import SemanticCache
+from .llm import LLMClient, Message
+from .memory import MemoryManager
 from .tools import ToolRegistry, ToolResult
 
 
-@dataclass
+_JSON_DECODER = json.JSONDecoder()
+
+_FINISH = "FINISH"
+
+_RULE = "=" * 60
+
+# Compiled once - _parse_response runs on every ReAct step
+# One alternation finds every section marker in a single pass
+# (ACTION_INPUT is listed before ACTION so it wins)
+# LLM output is untrusted, so these use RE2 when available (linear time)
+_MARKER_RE = regex_compile(r'(?i)(THOUGHT|ACTION_INPUT|ACTION):')
+_NAME_RE = regex_compile(r'\s*(\w+)')
+_INPUT_RE = regex_compile(r'(?i)ACTION_INPUT:')
+_TRAILING_COMMA_RE = regex_compile(r',\s*([}\]])')
+_FINISH_RE = regex_compile(r'(?i)' + _FINISH)
+_FINISH_ACTION_RE = regex_compile(r'(?i)ACTION:\s*FINISH\b')
+
+# Static system prompt; kept short since every step resends it
+_SYSTEM_TEMPLATE = """You are {name}, {role}.
+Work in ReAct steps: reason, act with a tool, observe the result, repeat.
+
+{tools_desc}
+
+Reply to EVERY step in EXACTLY this format:
+THOUGHT: <your reasoning>
+ACTION: <tool_name or FINISH>
+ACTION_INPUT: {{"param": "value"}}
+
+Independent tool calls may be listed as several ACTION / ACTION_INPUT pairs in one reply.
+To give the final answer use ACTION: FINISH with ACTION_INPUT: {{"answer": "<complete answer>"}}
+
+Rules: always start with THOUGHT; use tools for real data; you can use multiple tools in sequence; always end with FINISH; be thorough but efficient; if a tool fails, try another approach.
+"""
+
+
+def _balanced_end(text: str, start: int, end: int) -> int:
+    """
+    Index just past the brace closing the one at start
+    Braces inside quoted strings are ignored; returns end when the
+    object is not closed before it
+    """
+    depth = 0
+    quote = None
+    escaped = False
+    for i in range(start, end):
+        ch = text[i]
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote:
+                quote = None
+        elif ch == '"' or ch == "'":
+            quote = ch
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return end
+
+
+def _repair_json_object(span: str) -> Optional[Dict]:
+    """Last-chance parse of a near-JSON object (trailing commas, Python quoting)"""
+    candidates = (_TRAILING_COMMA_RE.sub(r"\1", span), span)
+    for candidate in candidates:
+        try:
+            obj = json.loads(candidate)
+        except ValueError:
+            try:
+                obj = ast.literal_eval(candidate)
+            except (ValueError, SyntaxError, MemoryError, RecursionError):
+                continue
+        if isinstance(obj, dict):
+            return obj
+    return None
+
+
+def _extract_json_object(
+    text: str, start: int = 0, end: Optional[int] = None
+) -> Tuple[Optional[Dict], int]:
+    """
+    Decode the first JSON object starting in text[start:end]
+    Returns (object, index just past it) so callers can skip marker-like
+    text inside the object's strings.
+    Fallbacks, in order: strict JSON at each '{' (raw_decode, so trailing
+    prose is fine), repaired near-JSON, then the raw balanced span
+    """
+    if end is None:
+        end = len(text)
+    first = idx = text.find("{", start, end)
+    if first == -1:
+        return None, start
+    
+    # Common case: the object is all that is left of the section
+    segment = text[first:end].rstrip()
+    if segment.endswith("}"):
+        try:
+            obj = json_loads(segment)
+        except ValueError:
+            pass
+        else:
+            if isinstance(obj, dict):
+                return obj, first + len(segment)
+    
+    # Strict decoding is not bounded by end: a string value can contain
+    # text that looks like the next marker. A candidate that fails is
+    # skipped as a whole - never retried from a '{' nested inside it,
+    # which would hand the tool an inner object as its arguments
+    while idx != -1:
+        try:
+            obj, stop = _JSON_DECODER.raw_decode(text, idx)
+        except json.JSONDecodeError:
+            idx = text.find("{", _balanced_end(text, idx, end), end)
+            continue
+        if isinstance(obj, dict):
+            return obj, stop
+        idx = text.find("{", stop, end)
+    
+    stop = _balanced_end(text, first, end)
+    span = text[first:stop]
+    repaired = _repair_json_object(span)
+    return (repaired if repaired is not None else {"raw": span}), stop
+
+
+def _final_answer_complete(text: str) -> bool:
+    """
+    True once a (partial) reply contains ACTION: FINISH followed by a
+    complete ACTION_INPUT object - everything after it is wasted tokens
+    """
+    finish = _FINISH_ACTION_RE.search(text)
+    if not finish:
+        return False
+    marker = _INPUT_RE.search(text, finish.end())
+    if not marker:
+        return False
+    start = text.find("{", marker.end())
+    if start == -1:
+        return False
+    try:
+        obj, _ = _JSON_DECODER.raw_decode(text, start)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(obj, dict)
+
+
+def _first_tool_action(text: str) -> Optional[Tuple[str, Dict]]:
+    """
+    The first (tool, params) pair of a (partial) reply, once its
+    ACTION_INPUT object is complete; None before that or for FINISH
+    """
+    name = None
+    for m in _MARKER_RE.finditer(text):
+        kind = m.group(1).upper()
+        if kind == "ACTION":
+            if name is not None:
+                return None  # first action had no input
+            name_match = _NAME_RE.match(text, m.end())
+            if name_match:
+                name = name_match.group(1)
+                if _FINISH_RE.fullmatch(name):
+                    return None
+        elif kind == "ACTION_INPUT" and name is not None:
+            start = text.find("{", m.end())
+            if start == -1:
+                return None
+            try:
+                obj, _ = _JSON_DECODER.raw_decode(text, start)
+            except json.JSONDecodeError:
+                return None
+            return (name, obj) if isinstance(obj, dict) else None
+    return None
+
+
+def _truncate_middle(text: str, limit: int) -> str:
+    """Keep the head (2/3) and tail (1/3) of text within about limit chars"""
+    if len(text) <= limit:
+        return text
+    head = limit * 2 // 3
+    tail = limit - head
+    cut = len(text) - head - tail
+    return f"{text[:head]}\n[...truncated {cut} chars...]\n{text[len(text) - tail:]}"
+
+
+def _reply_text(reply: Any) -> str:
+    """Text of an LLM reply: LLM clients return a Message, simple stubs a str"""
+    return reply.content if isinstance(reply, Message) else reply
+
+
+@dataclass(**DATACLASS_SLOTS)
 class AgentStep:
     """One step in agent's reasoning chain"""
     step_number: int
@@ -24,6 +219,8 @@ class AgentStep:
     observation: Optional[str] = None
     is_final: bool = False
     final_answer: Optional[str] = None
+    # Every (tool, params) pair in the reply; action/action_input mirror the first
+    actions: List[Tuple[str, Dict]] = field(default_factory=list)
 
 
 class Agent:
@@ -42,104 +239,152 @@ class Agent:
         tools: Optional[ToolRegistry] = None,
         memory: Optional[MemoryManager] = None,
         max_steps: int = 10,
-        verbose: bool = True
+        verbose: bool = True,
+        use_semantic_cache: bool = False,
+        semantic_cache: Optional[SemanticCache] = None,
+        stream: bool = False,
+        tool_concurrency: int = 4,
+        max_observation_chars: Optional[int] = 3000,
+        persist_observations: bool = False
     ):
         self.name = name
         self.role = role
         self.llm = llm or LLMClient()
         self.tools = tools or ToolRegistry()
-        self.memory = memory or MemoryManager()
+        # Created on first use; agents that never run don't pay for a store
+        self._memory = memory
         self.max_steps = max_steps
         self.verbose = verbose
+        self.stream = stream
+        self.tool_concurrency = tool_concurrency
+        # Observations are resent on every later step; None disables the cap
+        self.max_observation_chars = max_observation_chars
+        # Keep the full text of truncated observations in long-term memory
+        self.persist_observations = persist_observations
+        self._parallel_executor: Optional[ThreadPoolExecutor] = None
+        # ((tool, params), future) started while a reply was still streaming
+        self._pending_action: Optional[tuple] = None
         self.history: List[AgentStep] = []
+        self._system_prompt_cache: Optional[tuple] = None
+        
+        # Built once; any other action name is a tool call
+        self._action_handlers = {
+            _FINISH: self._handle_finish,
+            None: self._handle_missing,
+        }
+        
+        # Reuse answers for repeated / paraphrased tasks
+        if semantic_cache is None and use_semantic_cache:
+            semantic_cache = SemanticCache()
+        self.semantic_cache = semantic_cache
+    
+    @property
+    def memory(self) -> MemoryManager:
+        """The agent's memory, created on first access"""
+        if self._memory is None:
+            self._memory = MemoryManager()
+        return self._memory
+    
+    @memory.setter
+    def memory(self, value: Optional[MemoryManager]):
+        self._memory = value
     
     def _build_system_prompt(self) -> str:
-        """Build the system prompt with tools info"""
-        tools_desc = self.tools.get_tools_description()
+        """Build the system prompt with tools info (cached until it changes)"""
+        return self._system_message()["content"]
+    
+    def _system_message(self) -> Dict:
+        """
+        The system message dict, reused across runs while unchanged
+        Passing the same object lets the LLM client reuse its cached
+        encoding of this (large) message instead of re-serializing it
+        """
+        signature = (self.name, self.role, id(self.tools), self.tools.version)
+        if self._system_prompt_cache and self._system_prompt_cache[0] == signature:
+            return self._system_prompt_cache[1]
         
-        return f"""You are {self.name}, {self.role}.
-
-You operate using the ReAct pattern (Reasoning and Acting).
-
-{tools_desc}
-
-## How to respond:
-
-For EACH step, you MUST use this EXACT format:
-
-THOUGHT: [Your reasoning about what to do next]
-ACTION: [tool_name]
-ACTION_INPUT: {{"param": "value"}}
-
-After getting results, continue thinking:
-
-THOUGHT: [Your reasoning about the observation]
-ACTION: [next_tool or FINISH]
-ACTION_INPUT: {{"param": "value"}}
-
-When you have the final answer, use:
-
-THOUGHT: [Your final reasoning]
-ACTION: FINISH
-ACTION_INPUT: {{"answer": "Your complete final answer here"}}
-
-## Rules:
-1. ALWAYS start with THOUGHT
-2. Use tools when you need real data
-3. You can use multiple tools in sequence
-4. ALWAYS end with ACTION: FINISH
-5. Be thorough but efficient
-6. If a tool fails, try a different approach
-"""
+        message = {"role": "system", "content": self._render_system_prompt()}
+        self._system_prompt_cache = (signature, message)
+        return message
+    
+    def _render_system_prompt(self) -> str:
+        """Render the system prompt from scratch"""
+        return _SYSTEM_TEMPLATE.format_map({
+            "name": self.name,
+            "role": self.role,
+            "tools_desc": self.tools.get_tools_description(),
+        })
     
     def _build_user_prompt(self, task: str) -> str:
-        """Build user prompt with context"""
-        context = self.memory.get_context()
-        
-        prompt = f"""Task: {task}
-
-{context}
+        """
+        Build the user prompt - the task only
+        Volatile memory context goes in a separate trailing message (see
+        _context_message) so system + task stay a byte-identical prefix
+        """
+        return f"""Task: {task}
 
 Begin your reasoning. Remember: THOUGHT -> ACTION -> observe result -> repeat until done."""
-        
-        return prompt
+    
+    def _context_message(self) -> Optional[Dict]:
+        """Current memory context as a system message, or None if empty"""
+        if not self.memory.short_term.items:
+            return None
+        context = self.memory.get_context()
+        return {"role": "system", "content": f"<context>\n{context}\n</context>"}
     
     def _parse_response(self, response: str, step_num: int) -> AgentStep:
         """Parse LLM response into structured step"""
         step = AgentStep(step_number=step_num, thought="")
         
-        # Extract THOUGHT
-        thought_match = re.search(
-            r'THOUGHT:\s*(.+?)(?=ACTION:|$)', 
-            response, 
-            re.DOTALL | re.IGNORECASE
-        )
-        if thought_match:
-            step.thought = thought_match.group(1).strip()
-        
-        # Extract ACTION
-        action_match = re.search(
-            r'ACTION:\s*(\w+)', 
-            response, 
-            re.IGNORECASE
-        )
-        if action_match:
-            step.action = action_match.group(1).strip()
-        
-        # Extract ACTION_INPUT
-        input_match = re.search(
-            r'ACTION_INPUT:\s*(\{.*?\})', 
-            response, 
-            re.DOTALL | re.IGNORECASE
-        )
-        if input_match:
-            try:
-                step.action_input = json.loads(input_match.group(1))
-            except json.JSONDecodeError:
-                step.action_input = {"raw": input_match.group(1)}
+        # Single scan: every THOUGHT / ACTION / ACTION_INPUT marker, in order
+        markers = [
+            (m.group(1).upper(), m.start(), m.end())
+            for m in _MARKER_RE.finditer(response)
+        ]
+        
+        pairs = []
+        thought_start = thought_end = None
+        consumed = 0  # end of the last decoded ACTION_INPUT
+        for i, (kind, marker_start, body_start) in enumerate(markers):
+            if marker_start < consumed:
+                continue  # marker text inside an ACTION_INPUT string
+            if kind == "THOUGHT":
+                if thought_start is None:
+                    thought_start = body_start
+                continue
+            
+            if kind == "ACTION":
+                # The first THOUGHT runs up to the next ACTION
+                if thought_start is not None and thought_end is None:
+                    thought_end = marker_start
+                name_match = _NAME_RE.match(response, body_start)
+                if not name_match:
+                    continue
+                if pairs and _FINISH_RE.fullmatch(pairs[-1][0]):
+                    break
+                pairs.append((name_match.group(1), None))
+            elif pairs and pairs[-1][1] is None:
+                # ACTION_INPUT belongs to the latest action, up to the next one
+                end = next(
+                    (m[1] for m in markers[i + 1:] if m[0] == "ACTION"),
+                    len(response)
+                )
+                params, consumed = _extract_json_object(response, body_start, end)
+                pairs[-1] = (pairs[-1][0], params)
+        
+        if thought_start is not None:
+            step.thought = response[thought_start:thought_end].strip()
+        
+        if pairs:
+            # Tools listed before a FINISH run first; the model must see
+            # their results before its answer can be trusted
+            if len(pairs) > 1 and _FINISH_RE.fullmatch(pairs[-1][0]):
+                pairs.pop()
+            step.action, step.action_input = pairs[0]
+            step.actions = pairs
         
         # Check if this is the final step
-        if step.action and step.action.upper() == "FINISH":
+        if step.action and _FINISH_RE.fullmatch(step.action):
             step.is_final = True
             if step.action_input and "answer" in step.action_input:
                 step.final_answer = step.action_input["answer"]
@@ -157,20 +402,237 @@ Begin your reasoning. Remember: THOUGHT -> ACTION -> observe result -> repeat un
         params = step.action_input or {}
         
         result = self.tools.execute(tool_name, **params)
+        return self._format_result(result)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Thread pool for concurrent tool calls, created on first use"""
+        if self._parallel_executor is None:
+            self._parallel_executor = ThreadPoolExecutor(
+                max_workers=self.tool_concurrency
+            )
+        return self._parallel_executor
+    
+    def _take_pending(self, step: AgentStep):
+        """Future of the tool call started during streaming, if it matches step"""
+        pending, self._pending_action = self._pending_action, None
+        if pending is not None and step.actions and step.actions[0] == pending[0]:
+            return pending[1]
+        return None
+    
+    def _execute_actions(self, step: AgentStep) -> str:
+        """
+        Execute every action in a step
+        Independent tool calls run concurrently on a thread pool; the
+        observation lists results in the order the model asked for them
+        """
+        early = self._take_pending(step)
+        if len(step.actions) <= 1 and early is None:
+            return self._execute_action(step)
         
+        executor = self._get_executor()
+        futures = [early] if early is not None else []
+        futures += [
+            executor.submit(self.tools.execute, name.lower(), **(params or {}))
+            for name, params in step.actions[len(futures):]
+        ]
+        results = [f.result() for f in futures]
+        if len(results) == 1:
+            return self._format_result(results[0])
+        return self._format_results(step, results)
+    
+    @staticmethod
+    def _format_result(result: ToolResult) -> str:
+        """Observation text for a single tool result"""
         if result.success:
             return f"Result: {result.output}"
         else:
             return f"Error: {result.error}"
     
-    def _log(self, message: str):
-        """Print if verbose mode is on"""
+    @staticmethod
+    def _format_results(step: AgentStep, results: List[ToolResult]) -> str:
+        """Combine the results of several actions into one observation"""
+        lines = []
+        for i, ((name, _), result) in enumerate(zip(step.actions, results), 1):
+            if result.success:
+                lines.append(f"[{i}] {name} Result: {result.output}")
+            else:
+                lines.append(f"[{i}] {name} Error: {result.error}")
+        return "\n".join(lines)
+    
+    def _log(self, fmt: str, *args):
+        """
+        Print if verbose mode is on
+        Formatting is lazy: fmt % args only runs when the line is printed
+        """
+        if self.verbose:
+            print(fmt % args if args else fmt)
+    
+    def _chat(self, messages: List[Dict]):
+        """
+        Get the next LLM reply
+        In stream mode generation is cut off as soon as the final answer
+        is complete, instead of paying for whatever the model adds after it
+        """
+        if self.stream and hasattr(self.llm, "chat_stream"):
+            self._pending_action = None
+            return _reply_text(self.llm.chat_stream(messages, stop_when=self._watch_stream))
+        return _reply_text(self.llm.chat(messages))
+    
+    def _watch_stream(self, text: str) -> bool:
+        """
+        Inspect a partial streamed reply
+        Starts the first tool call as soon as its ACTION_INPUT is complete,
+        overlapping tool I/O with the rest of generation; returns True
+        (stop streaming) once the final answer is complete
+        Only side-effect-free tools start early: the finished reply may
+        still fail to parse or name a different action
+        """
+        if _final_answer_complete(text):
+            return True
+        if self._pending_action is None:
+            action = _first_tool_action(text)
+            if action is not None:
+                name, params = action
+                future = None  # other tools wait for the parsed reply
+                if name.lower() in ToolRegistry.PURE_TOOLS:
+                    future = self._get_executor().submit(self.tools.execute, name.lower(), **params)
+                self._pending_action = (action, future)
+        return False
+    
+    def _start_run(self, task: str, context: Optional[str] = None):
+        """
+        Prepare a run: (cached_answer, messages, cache_namespace)
+        cached_answer is set when the semantic cache already knows the task
+        """
+        self._log("\n%s", _RULE)
+        self._log("  Agent: %s", self.name)
+        self._log("  Task: %s", task)
+        self._log("%s\n", _RULE)
+        
+        system_message = self._system_message()
+        system_prompt = system_message["content"]
+        namespace_source = system_prompt if not context else f"{system_prompt}\0{context}"
+        cache_namespace = hashlib.sha256(namespace_source.encode("utf-8")).hexdigest()
+        
+        # Answer from the semantic cache without calling the LLM
+        if self.semantic_cache is not None:
+            cached = self.semantic_cache.get(task, namespace=cache_namespace)
+            if cached is not None:
+                self._log("  ⚡ Semantic cache hit: %.200s", cached)
+                self.history = []
+                return cached, [], cache_namespace
+        
+        # Store task in memory
+        self.memory.remember(f"Task: {task}", importance=0.8)
+        
+        # Build initial messages: stable prefix first, volatile context last.
+        # Caller context (e.g. results of earlier tasks) is its own system
+        # message ahead of the task, so runs sharing it share the prefix
+        messages = [system_message]
+        if context:
+            messages.append({"role": "system", "content": context})
+        messages.append({"role": "user", "content": self._build_user_prompt(task)})
+        context_message = self._context_message()
+        if context_message is not None:
+            messages.append(context_message)
+        
+        self.history = []
+        return None, messages, cache_namespace
+    
+    def _next_step(self, response: str, step_num: int) -> AgentStep:
+        """Parse an LLM response and record it in history"""
+        step = self._parse_response(response, step_num)
+        self.history.append(step)
+        
+        self._log("  Thought: %.100s...", step.thought)
+        return step
+    
+    def _finish(self, task: str, step: AgentStep, cache_namespace: str) -> str:
+        """Store and return the final answer"""
+        self._log("\n  ✅ Final Answer: %.200s", step.final_answer)
+        
+        # Store result in memory
+        self.memory.remember(
+            f"Completed: {task} -> {step.final_answer}",
+            importance=0.9
+        )
+        
+        answer = step.final_answer or step.thought
+        if self.semantic_cache is not None:
+            self.semantic_cache.put(task, answer, namespace=cache_namespace)
+        
+        return answer
+    
+    def _continue(self, response: str, observation: Optional[str], messages: List[Dict]):
+        """Add the step and its observation to the conversation"""
+        messages.append({
+            "role": "assistant", 
+            "content": response
+        })
+        
+        if observation is None:
+            # No action found, ask LLM to try again
+            messages.append({
+                "role": "user", 
+                "content": "Please follow the format: THOUGHT, ACTION, ACTION_INPUT"
+            })
+        else:
+            # Add to conversation for next iteration
+            messages.append({
+                "role": "user", 
+                "content": f"OBSERVATION: {observation}\n\nContinue your reasoning."
+            })
+    
+    @staticmethod
+    def _action_key(step: AgentStep) -> Optional[str]:
+        """Handler key: FINISH, None (no action) or the tool name"""
+        return _FINISH if step.is_final else step.action
+    
+    def _handle_finish(self, task, step, response, messages, cache_namespace) -> str:
+        """Final answer - we're done"""
+        return self._finish(task, step, cache_namespace)
+    
+    def _handle_missing(self, task, step, response, messages, cache_namespace) -> None:
+        """No action found - ask the LLM to follow the format"""
+        self._continue(response, None, messages)
+    
+    def _handle_tool(self, task, step, response, messages, cache_namespace) -> None:
+        """Execute the tool action and feed back the observation"""
         if self.verbose:
-            print(message)
+            self._log("  Action: %s", ", ".join(name for name, _ in step.actions))
+        observation = self._execute_actions(step)
+        self._observe(step, observation, response, messages)
+    
+    def _observe(self, step: AgentStep, observation: str, response: str, messages: List[Dict]):
+        """Record an observation and continue the conversation"""
+        step.observation = observation
+        self._log("  Observation: %.100s...", observation)
+        
+        limit = self.max_observation_chars
+        if limit is not None and len(observation) > limit:
+            if self.persist_observations:
+                # Full text stays recoverable from long-term memory
+                self.memory.long_term.add(
+                    observation, category="observations", importance=0.3
+                )
+            observation = _truncate_middle(observation, limit)
+        self._continue(response, observation, messages)
+    
+    def _max_steps_result(self) -> str:
+        """Best available answer when the loop runs out of steps"""
+        self._log("\n  ⚠️  Max steps (%d) reached", self.max_steps)
+        
+        if self.history:
+            last = self.history[-1]
+            return last.final_answer or last.thought or "Could not complete the task"
+        
+        return "No result"
     
-    def run(self, task: str) -> str:
+    def run(self, task: str, context: Optional[str] = None) -> str:
         """
         Run the agent on a task
+        context: optional background (e.g. earlier results) sent as a
+        system message before the task instead of being pasted into it
         
         This is the main loop:
         1. Think about the task
@@ -179,85 +641,92 @@ Begin your reasoning. Remember: THOUGHT -> ACTION -> observe result -> repeat un
         4. Observe the result
         5. Repeat until done
         """
-        self._log(f"\n{'='*60}")
-        self._log(f"  Agent: {self.name}")
-        self._log(f"  Task: {task}")
-        self._log(f"{'='*60}\n")
+        cached, messages, cache_namespace = self._start_run(task, context)
+        if cached is not None:
+            return cached
         
-        # Store task in memory
-        self.memory.remember(f"Task: {task}", importance=0.8)
+        for step_num in range(1, self.max_steps + 1):
+            self._log("--- Step %d ---", step_num)
+            
+            # Get LLM response
+            response = self._chat(messages)
+            
+            if not response:
+                self._log("  [ERROR] No response from LLM")
+                break
+            
+            step = self._next_step(response, step_num)
+            
+            # One dict lookup picks finish / retry / tool handling
+            handler = self._action_handlers.get(
+                self._action_key(step), self._handle_tool
+            )
+            answer = handler(task, step, response, messages, cache_namespace)
+            if answer is not None:
+                return answer
         
-        # Build initial messages
-        messages = [
-            {"role": "system", "content": self._build_system_prompt()},
-            {"role": "user", "content": self._build_user_prompt(task)}
+        return self._max_steps_result()
+    
+    async def _aexecute_action(self, step: AgentStep) -> str:
+        """Execute the action from a step without blocking the event loop"""
+        if not step.action or step.is_final:
+            return ""
+        
+        # The first call may already be running since the reply streamed in
+        early = self._take_pending(step)
+        calls = [asyncio.wrap_future(early)] if early is not None else []
+        calls += [
+            self.tools.aexecute(name.lower(), **(params or {}))
+            for name, params in step.actions[len(calls):]
         ]
         
-        self.history = []
+        if len(calls) > 1:
+            return self._format_results(step, await asyncio.gather(*calls))
+        return self._format_result(await calls[0])
+    
+    async def arun(self, task: str, context: Optional[str] = None) -> str:
+        """
+        Async version of run
+        Awaits the LLM (llm.achat when available) and tools, so many agents
+        can wait on network I/O concurrently in one event loop
+        """
+        cached, messages, cache_namespace = self._start_run(task, context)
+        if cached is not None:
+            return cached
+        
+        # Streaming is sync-only; it runs in the executor via _chat
+        achat = None if self.stream else getattr(self.llm, "achat", None)
+        loop = asyncio.get_running_loop()
         
         for step_num in range(1, self.max_steps + 1):
-            self._log(f"--- Step {step_num} ---")
+            self._log("--- Step %d ---", step_num)
             
             # Get LLM response
-            response = self.llm.chat(messages)
+            if achat is not None:
+                response = _reply_text(await achat(messages))
+            else:
+                response = await loop.run_in_executor(None, self._chat, messages)
             
             if not response:
                 self._log("  [ERROR] No response from LLM")
                 break
             
-            # Parse response
-            step = self._parse_response(response, step_num)
-            self.history.append(step)
-            
-            self._log(f"  Thought: {step.thought[:100]}...")
+            step = self._next_step(response, step_num)
             
-            # If final answer, we're done
-            if step.is_final:
-                self._log(f"\n  ✅ Final Answer: {step.final_answer[:200]}")
-                
-                # Store result in memory
-                self.memory.remember(
-                    f"Completed: {task} -> {step.final_answer}",
-                    importance=0.9
-                )
-                
-                return step.final_answer or step.thought
+            handler = self._action_handlers.get(self._action_key(step))
+            if handler is not None:
+                answer = handler(task, step, response, messages, cache_namespace)
+                if answer is not None:
+                    return answer
+                continue
             
-            # Execute action
-            if step.action:
-                self._log(f"  Action: {step.action}")
-                observation = self._execute_action(step)
-                step.observation = observation
-                self._log(f"  Observation: {observation[:100]}...")
-                
-                # Add to conversation for next iteration
-                messages.append({
-                    "role": "assistant", 
-                    "content": response
-                })
-                messages.append({
-                    "role": "user", 
-                    "content": f"OBSERVATION: {observation}\n\nContinue your reasoning."
-                })
-            else:
-                # No action found, ask LLM to try again
-                messages.append({
-                    "role": "assistant", 
-                    "content": response
-                })
-                messages.append({
-                    "role": "user", 
-                    "content": "Please follow the format: THOUGHT, ACTION, ACTION_INPUT"
-                })
-        
-        # Max steps reached
-        self._log(f"\n  ⚠️  Max steps ({self.max_steps}) reached")
-        
-        if self.history:
-            last = self.history[-1]
-            return last.final_answer or last.thought or "Could not complete the task"
+            # Tool actions are awaited so other agents keep running
+            if self.verbose:
+                self._log("  Action: %s", ", ".join(name for name, _ in step.actions))
+            observation = await self._aexecute_action(step)
+            self._observe(step, observation, response, messages)
         
-        return "No result"
+        return self._max_steps_result()
     
     def chat(self, message: str) -> str:
         """
@@ -278,7 +747,7 @@ Begin your reasoning. Remember: THOUGHT -> ACTION -> observe result -> repeat un
             {"role": "user", "content": message}
         ]
         
-        response = self.llm.chat(messages)
+        response = _reply_text(self.llm.chat(messages))
         
         if response:
             self.memory.short_term.add(
@@ -306,7 +775,15 @@ Begin your reasoning. Remember: THOUGHT -> ACTION -> observe result -> repeat un
     def reset(self):
         """Reset agent state"""
         self.history = []
-        self.memory.short_term.clear()
+        if self._memory is not None:
+            self._memory.short_term.clear()
+    
+    def close(self):
+        """Shut down the tool thread pool (recreated if the agent runs again)"""
+        self._pending_action = None
+        executor, self._parallel_executor = self._parallel_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
     
     def __repr__(self):
         return f"Agent(name='{self.name}', tools={self.tools.list_tools()})"
@@ -0,0 +1,285 @@
+"""
+Caching for NexaFlow
+Skip repeated LLM round-trips by reusing earlier answers
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .embeddings import Embedder, best_match, stack_vectors
+
+
+def _normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, for exact matching"""
+    return " ".join(query.lower().split())
+
+
+class _SemanticEntry:
+    """One cached answer with its query embedding and normalized text"""
+    __slots__ = ("vector", "key", "answer", "created_at", "last_used")
+
+    def __init__(self, vector: Any, key: str, answer: str):
+        self.vector = vector
+        self.key = key
+        self.answer = answer
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class _SemanticBucket:
+    """Entries sharing a namespace, with a lazily stacked matrix"""
+
+    def __init__(self):
+        self.entries: List[_SemanticEntry] = []
+        self.by_key: Dict[str, _SemanticEntry] = {}
+        self._matrix = None
+
+    def add(self, entry: _SemanticEntry):
+        self.entries.append(entry)
+        self.by_key[entry.key] = entry
+        self._matrix = None
+
+    def remove(self, entry: _SemanticEntry):
+        self.entries.remove(entry)
+        if self.by_key.get(entry.key) is entry:
+            del self.by_key[entry.key]
+        self._matrix = None
+
+    def matrix(self) -> Any:
+        if self._matrix is None:
+            self._matrix = stack_vectors([e.vector for e in self.entries])
+        return self._matrix
+
+
+class SemanticCache:
+    """
+    Semantic response cache
+    Returns a stored answer when a new query embeds close enough to one
+    answered before (cosine similarity >= threshold)
+
+    Entries are grouped by namespace (e.g. a hash of the system prompt) so
+    answers never leak between differently configured agents.
+
+    Without a real embedding model (Embedder's hashed bag-of-words
+    fallback) near-identical vectors don't mean the same question -
+    "1234 * 5678" and "1234 * 5679" score ~0.96 - so in that mode only an
+    exact match of the normalized query is a hit.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        threshold: float = 0.92,
+        max_size: int = 256,
+        ttl: Optional[float] = None
+    ):
+        self.embedder = embedder or Embedder()
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._buckets: Dict[str, _SemanticBucket] = {}
+        self._size = 0
+
+    def get(self, query: str, namespace: str = "") -> Optional[str]:
+        """Return a cached answer for a similar query, if any"""
+        bucket = self._buckets.get(namespace)
+        if bucket is not None:
+            self._expire(bucket)
+
+        if not bucket or not bucket.entries:
+            self.misses += 1
+            return None
+
+        if self._semantic():
+            idx, score = best_match(bucket.matrix(), self.embedder.encode(query))
+            entry = bucket.entries[idx] if idx is not None and score >= self.threshold else None
+        else:
+            entry = bucket.by_key.get(_normalize_query(query))
+        if entry is None:
+            self.misses += 1
+            return None
+
+        entry.last_used = time.monotonic()
+        self.hits += 1
+        return entry.answer
+
+    def put(self, query: str, answer: str, namespace: str = ""):
+        """Store an answer for a query"""
+        bucket = self._buckets.setdefault(namespace, _SemanticBucket())
+        vector = self.embedder.encode(query) if self._semantic() else None
+        bucket.add(_SemanticEntry(vector, _normalize_query(query), answer))
+        self._size += 1
+
+        while self._size > self.max_size:
+            self._evict_lru()
+
+    def _semantic(self) -> bool:
+        """Whether similarity can be trusted (custom embedders are assumed to be real)"""
+        return getattr(self.embedder, "semantic", True)
+
+    def _expire(self, bucket: _SemanticBucket):
+        """Drop entries older than ttl"""
+        if self.ttl is None:
+            return
+        cutoff = time.monotonic() - self.ttl
+        for entry in [e for e in bucket.entries if e.created_at < cutoff]:
+            bucket.remove(entry)
+            self._size -= 1
+
+    def _evict_lru(self):
+        """Remove the least recently used entry across all namespaces"""
+        oldest_bucket, oldest = None, None
+        for bucket in self._buckets.values():
+            for entry in bucket.entries:
+                if oldest is None or entry.last_used < oldest.last_used:
+                    oldest_bucket, oldest = bucket, entry
+        if oldest is None:
+            self._size = 0
+            return
+        oldest_bucket.remove(oldest)
+        self._size -= 1
+
+    def clear(self):
+        """Remove all cached answers"""
+        self._buckets.clear()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class LRUCache:
+    """
+    Bounded exact-match cache with least-recently-used eviction
+    Tracks hits and misses so callers can report cache effectiveness.
+    Entries older than ttl seconds (if set) count as misses.
+    Safe to share between threads (e.g. tools run in parallel)
+    """
+
+    def __init__(self, max_size: int = 256, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return the cached value for key, marking it recently used"""
+        with self._lock:
+            try:
+                value, expires = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Any, value: Any):
+        """Store a value, evicting the least recently used if full"""
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Any) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and (entry[1] is None or entry[1] >= time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteToolCache:
+    """
+    Persistent exact-match cache for tool outputs
+    Same get/put interface as LRUCache, backed by a SQLite file so cached
+    results survive restarts. Entries older than ttl seconds are ignored
+    and removed by sweep()
+    """
+
+    def __init__(
+        self,
+        path: str = "nexaflow_cache/tool_cache.db",
+        ttl: Optional[float] = None
+    ):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Tools run on worker threads, so share one connection under a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tool_cache ("
+            "key BLOB PRIMARY KEY, tool_name TEXT, output TEXT, ts REAL)"
+        )
+        self.sweep()
+
+    def get(self, key: bytes, default: Any = None) -> Any:
+        """Return the cached output for key, if present and fresh"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output, ts FROM tool_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (self.ttl is not None and row[1] < time.time() - self.ttl):
+            self.misses += 1
+            return default
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: bytes, value: str, tool_name: str = ""):
+        """Store a tool output"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_cache VALUES (?, ?, ?, ?)",
+                (key, tool_name, value, time.time())
+            )
+
+    def sweep(self) -> int:
+        """Delete expired entries; returns how many were removed"""
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM tool_cache WHERE ts < ?", (time.time() - self.ttl,)
+            )
+        return cursor.rowcount
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._conn.execute("DELETE FROM tool_cache")
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tool_cache").fetchone()[0]
@@ -0,0 +1,266 @@
+"""
+Embedding utilities for NexaFlow
+Local text embeddings and cosine similarity for caches and memory
+"""
+
+import functools
+import heapq
+import math
+import re
+import zlib
+from typing import Any, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional - pure Python fallback below
+    np = None
+
+
+# numba and faiss are optional and slow to import, so they are loaded on
+# first use rather than with the module
+
+@functools.lru_cache(maxsize=None)
+def _faiss() -> Any:
+    """The faiss module, or None when it (or NumPy) is not installed"""
+    if np is None:
+        return None
+    try:
+        import faiss
+    except ImportError:  # faiss is optional - exact search is used without it
+        return None
+    return faiss
+
+
+@functools.lru_cache(maxsize=None)
+def _kernels() -> Tuple[Any, Any]:
+    """The compiled (cosine, decay) kernels, or (None, None) without numba"""
+    if np is None:
+        return None, None
+    try:
+        from numba import njit
+    except ImportError:  # numba is optional - NumPy is used without it
+        return None, None
+
+    # Serial on purpose: callers run on thread pools, and numba's default
+    # workqueue threading layer aborts on concurrent parallel regions
+    @njit(cache=True, fastmath=True)
+    def cosine_kernel(matrix, query):
+        """Fused normalize + dot product per row, compiled once and cached"""
+        n, dim = matrix.shape
+        q_norm = 0.0
+        for j in range(dim):
+            q_norm += query[j] * query[j]
+        q_norm = np.sqrt(q_norm)
+
+        out = np.empty(n, dtype=np.float32)
+        for i in range(n):
+            dot = 0.0
+            row_norm = 0.0
+            for j in range(dim):
+                dot += matrix[i, j] * query[j]
+                row_norm += matrix[i, j] * matrix[i, j]
+            denom = np.sqrt(row_norm) * q_norm
+            out[i] = dot / denom if denom > 0.0 else 0.0
+        return out
+
+    @njit(cache=True, fastmath=True)
+    def decay_kernel(importance, timestamps, now, half_life):
+        """importance * exp(-age / half_life) per item"""
+        out = np.empty(importance.shape[0], dtype=np.float64)
+        for i in range(importance.shape[0]):
+            out[i] = importance[i] * np.exp(-(now - timestamps[i]) / half_life)
+        return out
+
+    return cosine_kernel, decay_kernel
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class Embedder:
+    """
+    Local text embedder
+    Uses sentence-transformers when installed, otherwise falls back to a
+    hashed bag-of-words vector so everything still works with zero
+    dependencies (no remote embedding API round-trips either way)
+    """
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        dim: int = 256
+    ):
+        self.model_name = model_name
+        self.dim = dim
+        self._model = None
+        self._model_checked = False
+
+    def _get_model(self):
+        """Load the sentence-transformers model once, if available"""
+        if not self._model_checked:
+            self._model_checked = True
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(self.model_name)
+            except Exception:  # not installed, or the model failed to load
+                self._model = None
+        return self._model
+    
+    @property
+    def semantic(self) -> bool:
+        """True when vectors come from a real model, not the hashed fallback"""
+        return self._get_model() is not None
+
+    def encode(self, text: str) -> Any:
+        """Embed text as a unit-length vector"""
+        model = self._get_model()
+        if model is not None:
+            return model.encode(text, normalize_embeddings=True)
+        return self._hash_encode(text)
+
+    def _hash_encode(self, text: str) -> Any:
+        """Hashed bag-of-words fallback embedding"""
+        vec = [0.0] * self.dim
+        for token in _TOKEN_RE.findall(text.lower()):
+            vec[zlib.crc32(token.encode("utf-8")) % self.dim] += 1.0
+
+        norm = math.sqrt(sum(v * v for v in vec))
+        if norm:
+            vec = [v / norm for v in vec]
+
+        if np is not None:
+            return np.asarray(vec, dtype=np.float32)
+        return vec
+
+
+class ANNIndex:
+    """
+    Approximate nearest-neighbour index over unit vectors (FAISS HNSW)
+    Rows are append-only and keyed by an arbitrary hashable key; search
+    is O(log n) instead of the O(n) exact scan
+    """
+
+    def __init__(self, dim: int, neighbors: int = 32):
+        faiss = _faiss()
+        self.index = faiss.IndexHNSWFlat(dim, neighbors, faiss.METRIC_INNER_PRODUCT)
+        self.keys: List[Any] = []
+        self._key_set = set()
+
+    @staticmethod
+    def available() -> bool:
+        return _faiss() is not None
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._key_set
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, keys: Sequence[Any], vectors: Sequence[Any]):
+        """Append one row per key"""
+        if not len(keys):
+            return
+        self.index.add(np.ascontiguousarray(np.vstack(vectors), dtype=np.float32))
+        self.keys.extend(keys)
+        self._key_set.update(keys)
+
+    def search(self, query: Any, k: int) -> List[Tuple[Any, float]]:
+        """(key, score) of the k nearest rows, best first"""
+        if not self.keys or k <= 0:
+            return []
+        k = min(k, len(self.keys))
+        self.index.hnsw.efSearch = max(64, k)
+        q = np.asarray(query, dtype=np.float32).reshape(1, -1)
+        scores, ids = self.index.search(q, k)
+        return [
+            (self.keys[i], float(score))
+            for i, score in zip(ids[0], scores[0]) if i != -1
+        ]
+
+
+def stack_vectors(vectors: Sequence[Any]) -> Any:
+    """Stack vectors into a matrix (NumPy array when available)"""
+    if np is not None:
+        return np.vstack(vectors) if len(vectors) else np.empty((0, 0))
+    return [list(v) for v in vectors]
+
+
+def cosine_similarities(matrix: Any, query: Any) -> List[float]:
+    """Cosine similarity of query against every row of matrix"""
+    if np is not None:
+        q = np.asarray(query, dtype=np.float32)
+        cosine_kernel = _kernels()[0]
+        if cosine_kernel is not None and matrix.ndim == 2 and matrix.shape[0]:
+            return cosine_kernel(np.ascontiguousarray(matrix, dtype=np.float32), q)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(q)
+        norms[norms == 0] = 1.0
+        return matrix @ q / norms
+
+    q_norm = math.sqrt(sum(v * v for v in query)) or 1.0
+    sims = []
+    for row in matrix:
+        row_norm = math.sqrt(sum(v * v for v in row)) or 1.0
+        dot = sum(a * b for a, b in zip(row, query))
+        sims.append(dot / (row_norm * q_norm))
+    return sims
+
+
+def best_match(matrix: Any, query: Any) -> Tuple[Optional[int], float]:
+    """Index and score of the row most similar to query"""
+    if len(matrix) == 0:
+        return None, 0.0
+
+    indices, scores = cosine_topk(matrix, query, 1)
+    return indices[0], scores[0]
+
+
+def top_k(scores: Sequence[float], k: int) -> List[int]:
+    """Indices of the k highest scores, best first"""
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return []
+    if np is not None:
+        scores = np.asarray(scores)
+        if k < n:
+            # argpartition picks ties at the cut arbitrarily; take the
+            # earliest ones so the result matches a stable full sort
+            kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            above = np.flatnonzero(scores > kth)
+            ties = np.flatnonzero(scores == kth)[:k - len(above)]
+            idx = np.sort(np.concatenate([above, ties]))
+        else:
+            idx = np.arange(n)
+        return [int(i) for i in idx[np.argsort(-scores[idx], kind="stable")]]
+    return heapq.nlargest(k, range(n), key=scores.__getitem__)
+
+
+def cosine_topk(matrix: Any, query: Any, k: int) -> Tuple[List[int], List[float]]:
+    """Indices and scores of the k rows most similar to query, best first"""
+    if len(matrix) == 0:
+        return [], []
+    sims = cosine_similarities(matrix, query)
+    indices = top_k(sims, k)
+    return indices, [float(sims[i]) for i in indices]
+
+
+def decayed_scores(
+    importance: Sequence[float],
+    timestamps: Sequence[float],
+    now: float,
+    half_life: float
+) -> Any:
+    """
+    Importance weighted by recency: importance * exp(-age / half_life)
+    timestamps, now and half_life share one unit (e.g. seconds)
+    """
+    if np is not None:
+        imp = np.asarray(importance, dtype=np.float64)
+        ts = np.asarray(timestamps, dtype=np.float64)
+        decay_kernel = _kernels()[1]
+        if decay_kernel is not None and len(imp):
+            return decay_kernel(imp, ts, float(now), float(half_life))
+        return imp * np.exp(-(now - ts) / half_life)
+    return [
+        imp * math.exp(-(now - ts) / half_life)
+        for imp, ts in zip(importance, timestamps)
+    ]
@@ -3,11 +3,22 @@ LLM integration module for NexaFlow
 Supports multiple LLM providers with a focus on free/local options
 """
 
+import asyncio
+import functools
 import json
-from typing import List, Dict, Optional, Any
+import weakref
+from typing import Callable, List, Dict, Optional, Any, Tuple, Union
 from dataclasses import dataclass
 
-@dataclass
+from ._compat import DATACLASS_SLOTS, json_dumps
+from .cache import LRUCache
+
+try:
+    from blake3 import blake3 as _request_hash
+except ImportError:
+    from hashlib import sha256 as _request_hash
+
+@dataclass(**DATACLASS_SLOTS)
 class Message:
     """Represents a chat message"""
     role: str  # 'system', 'user', 'assistant', 'tool'
@@ -20,6 +31,32 @@ class Message:
             data["tool_calls"] = self.tool_calls
         return data
 
+# Messages may also be passed as {"role", "content"} dicts or
+# lightweight (role, content) tuples
+MessageLike = Union[Message, Dict, Tuple[str, str]]
+
+
+def _message_dict(msg: MessageLike) -> Dict:
+    """Provider dict for any accepted message form"""
+    if isinstance(msg, Message):
+        return msg.to_dict()
+    if isinstance(msg, tuple):
+        return {"role": msg[0], "content": msg[1]}
+    return msg
+
+
+def _as_message(msg: MessageLike) -> Message:
+    """Message object for any accepted message form"""
+    if isinstance(msg, Message):
+        return msg
+    if isinstance(msg, tuple):
+        return Message(role=msg[0], content=msg[1])
+    return Message(
+        role=msg["role"],
+        content=msg.get("content", ""),
+        tool_calls=msg.get("tool_calls")
+    )
+
 @dataclass
 class LLMConfig:
     """Configuration for LLM providers"""
@@ -29,85 +66,402 @@ class LLMConfig:
     temperature: float = 0.7
     max_tokens: int = 2048
     base_url: Optional[str] = None
+    cache_size: int = 256  # exact-match cache, used when temperature == 0
+    cache_control: bool = False  # mark the stable prefix for provider prompt caching
 
 class LLM:
     """Unified interface for different LLM providers"""
     
+    # (provider, api_key, base_url) -> SDK client, shared across instances
+    _shared_clients: Dict[tuple, Any] = {}
+    
+    # event loop -> pooled httpx.AsyncClient shared by every async SDK client
+    _shared_async_http: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    
+    # Upper bound on memoized message encodings before the memo is reset
+    _MSG_CACHE_LIMIT = 4096
+    
     def __init__(self, config: LLMConfig):
         self.config = config
         self.client = None
+        self._exact_cache = LRUCache(max_size=config.cache_size)
+        self._msg_bytes_cache: Dict[int, tuple] = {}
+        self._async_client = None
+        self._async_loop = None
         self._setup_client()
     
+    @property
+    def cache_hits(self) -> int:
+        return self._exact_cache.hits
+    
+    @property
+    def cache_misses(self) -> int:
+        return self._exact_cache.misses
+    
+    def _encode_message(self, msg: MessageLike) -> bytes:
+        """
+        Canonical JSON bytes for one message, memoized by identity
+        An agent loop resends the same message objects every step, so only
+        the newly appended tail of the conversation is serialized
+        """
+        if isinstance(msg, Message):
+            fields = (msg.role, msg.content, msg.tool_calls)
+        elif isinstance(msg, dict):
+            fields = (msg.get("role"), msg.get("content"), msg.get("tool_calls"), len(msg))
+        else:
+            fields = ()  # tuples are immutable
+        
+        entry = self._msg_bytes_cache.get(id(msg))
+        # Holding msg in the entry keeps its id from being reused; the
+        # field check catches messages edited since they were encoded
+        if entry is not None and entry[0] is msg and entry[1] == fields:
+            return entry[2]
+        
+        if len(self._msg_bytes_cache) >= self._MSG_CACHE_LIMIT:
+            self._msg_bytes_cache.clear()
+        
+        # Message objects serialize straight from their fields, no dict copy
+        payload = _message_dict(msg) if isinstance(msg, tuple) else msg
+        encoded = json_dumps(payload, sort_keys=True, default=_message_dict)
+        self._msg_bytes_cache[id(msg)] = (msg, fields, encoded)
+        return encoded
+    
+    def _cache_key(self, messages: List[MessageLike], tools: Optional[List[Dict]]) -> bytes:
+        """Hash the canonical request body"""
+        envelope = {
+            "provider": self.config.provider,
+            "model": self.config.model,
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens,
+            "tools": tools,
+        }
+        hasher = _request_hash(json_dumps(envelope, sort_keys=True))
+        hasher.update(b"[" + b",".join(self._encode_message(m) for m in messages) + b"]")
+        return hasher.digest()
+    
     def _setup_client(self):
         """Initialize the appropriate LLM client"""
+        if self.config.provider not in ("groq", "openai"):
+            # Fallback to mock for testing
+            self.client = MockLLM()
+            return
+        
+        # SDK clients keep a pooled keep-alive HTTP connection; share one
+        # per endpoint so every LLM instance reuses the same TLS sessions
+        key = (self.config.provider, self.config.api_key, self.config.base_url)
+        client = LLM._shared_clients.get(key)
+        if client is None:
+            client = self._create_client()
+            if client is not None:
+                LLM._shared_clients[key] = client
+        self.client = client
+    
+    def _create_client(self):
+        """Create a new SDK client for the configured provider"""
         if self.config.provider == "groq":
             try:
                 from groq import Groq
-                self.client = Groq(api_key=self.config.api_key)
+                return Groq(api_key=self.config.api_key)
             except ImportError:
                 print("Warning: groq not installed. Run: pip install groq")
-                self.client = None
-        elif self.config.provider == "openai":
+                return None
+        try:
+            from openai import OpenAI
+            return OpenAI(
+                api_key=self.config.api_key,
+                base_url=self.config.base_url
+            )
+        except ImportError:
+            print("Warning: openai not installed. Run: pip install openai")
+            return None
+    
+    @classmethod
+    def close_all(cls):
+        """Close every shared SDK client and its connection pool"""
+        for client in cls._shared_clients.values():
+            close = getattr(client, "close", None)
+            if close:
+                close()
+        cls._shared_clients.clear()
+    
+    def _get_async_client(self):
+        """Async SDK client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = self._create_async_client()
+            self._async_loop = loop
+        return self._async_client
+    
+    def _create_async_client(self):
+        """Create a new async SDK client, or None if unavailable"""
+        try:
+            http_client = self._get_async_http_client()
+            if self.config.provider == "groq":
+                from groq import AsyncGroq
+                return AsyncGroq(api_key=self.config.api_key, http_client=http_client)
+            from openai import AsyncOpenAI
+            return AsyncOpenAI(
+                api_key=self.config.api_key,
+                base_url=self.config.base_url,
+                http_client=http_client
+            )
+        except ImportError:
+            return None
+    
+    @classmethod
+    def _get_async_http_client(cls):
+        """
+        Keep-alive httpx.AsyncClient for the running loop, or None
+        One pool per loop is shared by all LLM instances, so concurrent
+        agents reuse warm TLS connections (HTTP/2 when h2 is installed)
+        """
+        try:
+            import httpx
+        except ImportError:
+            return None  # let the SDK build its own client
+        
+        loop = asyncio.get_running_loop()
+        client = cls._shared_async_http.get(loop)
+        if client is None or client.is_closed:
             try:
-                from openai import OpenAI
-                self.client = OpenAI(
-                    api_key=self.config.api_key,
-                    base_url=self.config.base_url
-                )
+                import h2  # noqa: F401 - enables http2=True
+                http2 = True
             except ImportError:
-                print("Warning: openai not installed. Run: pip install openai")
-                self.client = None
-        else:
-            # Fallback to mock for testing
-            self.client = MockLLM()
+                http2 = False
+            client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+                timeout=httpx.Timeout(60.0, connect=10.0)
+            )
+            cls._shared_async_http[loop] = client
+        return client
+    
+    def _request_kwargs(self, message_dicts: List[Dict], tools: Optional[List[Dict]]) -> Dict:
+        """Build chat.completions.create arguments"""
+        kwargs = {
+            "model": self.config.model,
+            "messages": message_dicts,
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens,
+        }
+        
+        if tools:
+            kwargs["tools"] = tools
+            kwargs["tool_choice"] = "auto"
+        
+        if self.config.cache_control:
+            self._mark_cache_prefix(kwargs)
+        
+        return kwargs
     
-    def chat(self, messages: List[Message], tools: Optional[List[Dict]] = None) -> Message:
+    @staticmethod
+    def _mark_cache_prefix(kwargs: Dict):
+        """
+        Attach ephemeral cache_control markers to the end of the stable
+        prefix (tool schemas and the leading system message) so providers
+        with prefix caching reuse it on every ReAct step.
+        Copies are marked; the caller's dicts are left untouched.
+        """
+        ephemeral = {"type": "ephemeral"}
+        
+        tools = kwargs.get("tools")
+        if tools:
+            kwargs["tools"] = tools[:-1] + [dict(tools[-1], cache_control=ephemeral)]
+        
+        messages = kwargs["messages"]
+        if messages and messages[0].get("role") == "system":
+            content = messages[0].get("content")
+            if isinstance(content, str):
+                content = [{"type": "text", "text": content, "cache_control": ephemeral}]
+                kwargs["messages"] = [dict(messages[0], content=content)] + messages[1:]
+    
+    @staticmethod
+    def _to_message(response) -> Message:
+        """Convert an SDK completion into a Message"""
+        msg = response.choices[0].message
+        
+        tool_calls = None
+        if hasattr(msg, 'tool_calls') and msg.tool_calls:
+            tool_calls = [
+                {
+                    "id": tc.id,
+                    "function": {
+                        "name": tc.function.name,
+                        "arguments": tc.function.arguments
+                    }
+                }
+                for tc in msg.tool_calls
+            ]
+        
+        return Message(
+            role="assistant",
+            content=msg.content or "",
+            tool_calls=tool_calls
+        )
+    
+    def _cached(self, messages: List[MessageLike], tools: Optional[List[Dict]]):
+        """Look up the exact-match cache: (cache_key, cached_message)"""
+        # Only deterministic requests are cacheable
+        if self.config.temperature != 0:
+            return None, None
+        cache_key = self._cache_key(messages, tools)
+        return cache_key, self._exact_cache.get(cache_key)
+    
+    def chat(self, messages: List[MessageLike], tools: Optional[List[Dict]] = None) -> Message:
         """Send chat request to LLM"""
         if not self.client:
             return Message(role="assistant", content="LLM client not initialized.")
         
         # Convert messages to dict format
-        message_dicts = [msg.to_dict() for msg in messages]
+        message_dicts = [_message_dict(msg) for msg in messages]
+        
+        cache_key, cached = self._cached(messages, tools)
+        if cached is not None:
+            return cached
         
         try:
             if self.config.provider in ["groq", "openai"]:
-                kwargs = {
-                    "model": self.config.model,
-                    "messages": message_dicts,
-                    "temperature": self.config.temperature,
-                    "max_tokens": self.config.max_tokens,
-                }
-                
-                if tools:
-                    kwargs["tools"] = tools
-                    kwargs["tool_choice"] = "auto"
-                
-                response = self.client.chat.completions.create(**kwargs)
-                msg = response.choices[0].message
-                
-                tool_calls = None
-                if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                    tool_calls = [
-                        {
-                            "id": tc.id,
-                            "function": {
-                                "name": tc.function.name,
-                                "arguments": tc.function.arguments
-                            }
-                        }
-                        for tc in msg.tool_calls
-                    ]
-                
-                return Message(
-                    role="assistant",
-                    content=msg.content or "",
-                    tool_calls=tool_calls
+                response = self.client.chat.completions.create(
+                    **self._request_kwargs(message_dicts, tools)
                 )
+                result = self._to_message(response)
             else:
-                return self.client.chat(messages)
+                result = self.client.chat([_as_message(m) for m in messages])
+            
+            if cache_key is not None:
+                self._exact_cache.put(cache_key, result)
+            return result
                 
         except Exception as e:
             return Message(role="assistant", content=f"Error: {str(e)}")
+    
+    def chat_stream(
+        self,
+        messages: List[MessageLike],
+        stop_when: Optional[Callable[[str], bool]] = None,
+        check_every: int = 8
+    ) -> Message:
+        """
+        Streaming version of chat
+        Accumulates streamed deltas and, every check_every chunks, asks
+        stop_when(content_so_far) whether the reply is already usable; if so
+        the stream is closed early so the model stops generating tokens.
+        Falls back to chat() for providers without streaming.
+        """
+        if self.config.provider not in ["groq", "openai"] or not self.client:
+            return self.chat(messages)
+        
+        message_dicts = [_message_dict(msg) for msg in messages]
+        
+        cache_key, cached = self._cached(messages, None)
+        if cached is not None:
+            return cached
+        
+        try:
+            stream = self.client.chat.completions.create(
+                stream=True, **self._request_kwargs(message_dicts, None)
+            )
+        except Exception:
+            # Provider rejected stream=True - use a plain request
+            return self.chat(messages)
+        
+        parts: List[str] = []
+        completed = False
+        try:
+            for count, chunk in enumerate(stream, 1):
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                if stop_when is not None and count % check_every == 0:
+                    if stop_when("".join(parts)):
+                        break
+            else:
+                completed = True
+        except Exception as e:
+            # A cut-off reply must not pass for a complete one
+            return Message(role="assistant", content=f"Error: {str(e)}")
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+        
+        result = Message(role="assistant", content="".join(parts))
+        # Early-stopped replies are truncated; chat() must never get them
+        if completed and cache_key is not None:
+            self._exact_cache.put(cache_key, result)
+        return result
+    
+    async def achat(self, messages: List[MessageLike], tools: Optional[List[Dict]] = None) -> Message:
+        """Async version of chat - lets many requests wait on I/O at once"""
+        async_client = None
+        if self.config.provider in ["groq", "openai"]:
+            async_client = self._get_async_client()
+        
+        if async_client is None:
+            # No async SDK (or mock provider): run the sync call off-loop
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, functools.partial(self.chat, messages, tools)
+            )
+        
+        message_dicts = [_message_dict(msg) for msg in messages]
+        
+        cache_key, cached = self._cached(messages, tools)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await async_client.chat.completions.create(
+                **self._request_kwargs(message_dicts, tools)
+            )
+            result = self._to_message(response)
+            
+            if cache_key is not None:
+                self._exact_cache.put(cache_key, result)
+            return result
+        
+        except Exception as e:
+            return Message(role="assistant", content=f"Error: {str(e)}")
+    
+    async def achat_batch(
+        self,
+        batch: List[List[MessageLike]],
+        tools: Optional[List[Dict]] = None,
+        max_concurrency: int = 8
+    ) -> List[Message]:
+        """
+        Send several independent conversations concurrently
+        A semaphore caps in-flight requests to respect provider rate limits
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def limited(messages: List[MessageLike]) -> Message:
+            async with semaphore:
+                return await self.achat(messages, tools)
+        
+        return list(await asyncio.gather(*(limited(m) for m in batch)))
+    
+    def chat_batch(
+        self,
+        batch: List[List[MessageLike]],
+        tools: Optional[List[Dict]] = None,
+        max_concurrency: int = 8
+    ) -> List[Message]:
+        """Blocking wrapper around achat_batch (not for use inside an event loop)"""
+        return asyncio.run(self.achat_batch(batch, tools, max_concurrency))
+
+
+class LLMClient(LLM):
+    """
+    LLM configured by keyword, e.g. LLMClient(provider="mock")
+    Takes an LLMConfig or LLMConfig's fields; with neither it uses the defaults
+    """
+    
+    def __init__(self, config: Optional[LLMConfig] = None, **kwargs):
+        super().__init__(config or LLMConfig(**kwargs))
+
 
 class MockLLM:
     """Mock LLM for testing without API"""
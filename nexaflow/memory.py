@@ -3,27 +3,132 @@ Memory system for NexaFlow agents
 Provides short-term and long-term memory with persistence
 """
 
+import functools
 import json
 import os
-from typing import List, Dict, Optional, Any
+import queue
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+from itertools import islice
+from typing import List, Dict, Optional, Any, Deque, Set, Tuple
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 
+from ._compat import DATACLASS_SLOTS, json_dumps, json_loads
+from .embeddings import ANNIndex, Embedder, cosine_topk, decayed_scores, np, stack_vectors, top_k
 
-@dataclass
+
+@dataclass(**DATACLASS_SLOTS)
 class MemoryItem:
     """Single memory entry"""
     content: str
     memory_type: str  # 'conversation', 'fact', 'task', 'learning'
-    timestamp: str = ""
+    timestamp: int = field(default_factory=time.time_ns)  # ns since epoch
     importance: float = 0.5  # 0.0 to 1.0
-    tags: Optional[List[str]] = None
+    tags: List[str] = field(default_factory=list)
+    # Lowercased once here so keyword searches never re-lowercase content
+    content_lower: str = field(init=False, repr=False, compare=False)
     
     def __post_init__(self):
-        if not self.timestamp:
-            self.timestamp = datetime.now().isoformat()
-        if self.tags is None:
-            self.tags = []
+        self.content_lower = self.content.lower()
+    
+    def to_dict(self) -> Dict:
+        """Serializable dict, with the timestamp as an ISO string"""
+        data = asdict(self)
+        del data["content_lower"]
+        data["timestamp"] = _ns_to_iso(self.timestamp)
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MemoryItem":
+        """Inverse of to_dict (also accepts integer timestamps)"""
+        data = dict(data)
+        if "timestamp" in data:
+            data["timestamp"] = _iso_to_ns(data["timestamp"])
+        if data.get("tags") is None:
+            data.pop("tags", None)  # older stores saved null tags
+        return cls(**data)
+
+
+def _ns_to_iso(ns: int) -> str:
+    """Format a time_ns() value as a local ISO timestamp"""
+    return datetime.fromtimestamp(ns / 1e9).isoformat()
+
+
+def _iso_to_ns(value: Any) -> int:
+    """Parse a stored timestamp back into time_ns() form"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if not value:
+        return time.time_ns()
+    return round(datetime.fromisoformat(value).timestamp() * 1e6) * 1000
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class _KeywordIndex:
+    """
+    Inverted token index for substring keyword search
+    Any text containing the keyword has a token containing the keyword's
+    longest token, so only postings of matching vocabulary entries are
+    candidates; each candidate is then verified with a real substring test.
+    Results keep insertion order.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._entries: Dict[int, MemoryItem] = {}  # seq -> item
+        self._seqs: Dict[int, int] = {}  # id(item) -> seq
+        self._next_seq = 0
+
+    def add(self, item: MemoryItem):
+        seq = self._next_seq
+        self._next_seq += 1
+        self._entries[seq] = item
+        self._seqs[id(item)] = seq
+        for token in set(_TOKEN_RE.findall(item.content_lower)):
+            self._postings.setdefault(token, set()).add(seq)
+
+    def remove(self, item: MemoryItem):
+        seq = self._seqs.pop(id(item), None)
+        if seq is None:
+            return
+        item = self._entries.pop(seq)
+        for token in set(_TOKEN_RE.findall(item.content_lower)):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.discard(seq)
+                if not postings:
+                    del self._postings[token]
+
+    def search(self, keyword: str) -> List[MemoryItem]:
+        keyword_lower = keyword.lower()
+        tokens = _TOKEN_RE.findall(keyword_lower)
+        if not tokens:
+            # Nothing to look up (e.g. punctuation only) - scan everything
+            candidates = self._entries.keys()
+        else:
+            probe = max(tokens, key=len)
+            candidates = set()
+            for token, seqs in self._postings.items():
+                if probe in token:
+                    candidates |= seqs
+
+        entries = self._entries
+        return [
+            entries[seq] for seq in sorted(candidates)
+            if keyword_lower in entries[seq].content_lower
+        ]
+
+    def clear(self):
+        self._postings.clear()
+        self._entries.clear()
+        self._seqs.clear()
 
 
 class ShortTermMemory:
@@ -32,9 +137,18 @@ class ShortTermMemory:
     Like human working memory, limited capacity
     """
     
-    def __init__(self, max_items: int = 20):
+    EVICT_POLICIES = ("fifo", "importance")
+    
+    def __init__(self, max_items: int = 20, evict_policy: str = "fifo"):
+        if evict_policy not in self.EVICT_POLICIES:
+            raise ValueError(f"Unknown evict_policy: {evict_policy}")
         self.max_items = max_items
-        self.items: List[MemoryItem] = []
+        # fifo drops the oldest item; importance drops the least important
+        # (oldest first among ties)
+        self.evict_policy = evict_policy
+        # Ring buffer: appending past max_items drops the oldest in O(1)
+        self.items: Deque[MemoryItem] = deque(maxlen=max_items)
+        self._index = _KeywordIndex()
     
     def add(self, content: str, memory_type: str = "conversation", 
             importance: float = 0.5, tags: List[str] = None):
@@ -45,16 +159,29 @@ class ShortTermMemory:
             importance=importance,
             tags=tags or []
         )
+        if len(self.items) >= self.max_items:
+            if self.evict_policy == "importance":
+                self._evict_least_important()
+            elif self.items:
+                self._index.remove(self.items[0])  # about to fall off the deque
         self.items.append(item)
-        
-        # Remove oldest low-importance items if over capacity
-        if len(self.items) > self.max_items:
-            self.items.sort(key=lambda x: x.importance)
-            self.items = self.items[1:]  # Remove least important
+        self._index.add(item)
+    
+    def _evict_least_important(self):
+        """Drop the lowest-importance item - one O(n) scan, no sort"""
+        if not self.items:
+            return
+        items = self.items
+        idx = min(range(len(items)), key=lambda i: items[i].importance)
+        self._index.remove(items[idx])
+        del items[idx]
     
     def get_recent(self, count: int = 5) -> List[MemoryItem]:
         """Get most recent memories"""
-        return self.items[-count:]
+        # Walk back from the newest end: O(count) on a deque
+        recent = list(islice(reversed(self.items), max(count, 0)))
+        recent.reverse()
+        return recent
     
     def get_by_type(self, memory_type: str) -> List[MemoryItem]:
         """Get memories by type"""
@@ -62,15 +189,12 @@ class ShortTermMemory:
     
     def search(self, keyword: str) -> List[MemoryItem]:
         """Simple keyword search in memories"""
-        keyword_lower = keyword.lower()
-        return [
-            item for item in self.items 
-            if keyword_lower in item.content.lower()
-        ]
+        return self._index.search(keyword)
     
     def clear(self):
         """Clear all short-term memory"""
-        self.items = []
+        self.items.clear()
+        self._index.clear()
     
     def to_context_string(self, max_items: int = 10) -> str:
         """Convert recent memories to a context string for LLM"""
@@ -78,33 +202,123 @@ class ShortTermMemory:
         if not recent:
             return "No previous context."
         
-        lines = ["Previous context:"]
-        for item in recent:
-            lines.append(f"  [{item.memory_type}] {item.content}")
-        return "\n".join(lines)
+        return "Previous context:\n" + "\n".join(
+            f"  [{item.memory_type}] {item.content}" for item in recent
+        )
+
+
+_STOP = object()  # tells a writer thread to exit once the queue is drained
+
+
+def _append_lines(storage_path: str, filepath: str, lock: threading.Lock, lines: List[bytes]):
+    """Append encoded lines in a single write"""
+    with lock:
+        os.makedirs(storage_path, exist_ok=True)
+        with open(filepath, 'ab') as f:
+            f.write(b"".join(lines))
+
+
+def _drain_writes(write_queue: queue.Queue, write_lines, batch_size: int, interval: float):
+    """
+    Writer thread: coalesce queued lines into batched writes until _STOP
+    Holds no reference to the LongTermMemory, so the store can be collected
+    """
+    while True:
+        lines = [write_queue.get()]
+        deadline = time.monotonic() + interval
+        while len(lines) < batch_size and lines[-1] is not _STOP:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                lines.append(write_queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        stop = lines[-1] is _STOP
+        try:
+            if len(lines) > stop:
+                write_lines(lines[:-1] if stop else lines)
+        except OSError as e:
+            print(f"Warning: could not write long-term memory: {e}")
+        finally:
+            for _ in lines:
+                write_queue.task_done()
+        if stop:
+            return
+
+
+def _stop_writer(write_queue: queue.Queue):
+    """Let the writer thread finish the queued lines, then exit"""
+    write_queue.put(_STOP)
+    write_queue.join()
 
 
 class LongTermMemory:
     """
     Long-term memory with file-based persistence
     Stores important facts, learnings, and user preferences
+    
+    Items are appended one JSON line each to long_term.jsonl, so an add
+    writes one line instead of rewriting the store; compact() rewrites the
+    file when it has accumulated duplicate or dead lines.
+    With background_writes=True appends are handed to a writer thread and
+    batched, keeping disk I/O off the caller's path (see flush() and
+    close(); pending writes are also flushed at exit or garbage collection).
     """
     
-    def __init__(self, storage_path: str = "memory_store"):
+    FILENAME = "long_term.jsonl"
+    LEGACY_FILENAME = "long_term.json"
+    # Compact on load once this fraction of lines is redundant
+    COMPACT_THRESHOLD = 0.25
+    # Background writer: lines per write / max wait (s) to fill a batch
+    FLUSH_BATCH = 64
+    FLUSH_INTERVAL = 0.1
+    
+    def __init__(self, storage_path: str = "memory_store", background_writes: bool = False):
         self.storage_path = storage_path
+        self.filepath = os.path.join(storage_path, self.FILENAME)
+        self._file_lock = threading.Lock()
+        self._write_queue: Optional[queue.Queue] = None
+        self._writer: Optional[weakref.finalize] = None
         self.memories: Dict[str, List[MemoryItem]] = {
             "facts": [],
             "learnings": [],
             "preferences": [],
             "tasks": []
         }
+        # Keyword index per category, so search keeps category order
+        self._indexes: Dict[str, _KeywordIndex] = {
+            category: _KeywordIndex() for category in self.memories
+        }
+        self._seen: Set[Tuple[str, str]] = set()  # (category, content)
+        self._rank_cache: Optional[tuple] = None  # (items, importance, timestamps)
         self._load()
+        
+        if background_writes:
+            self._write_queue = queue.Queue()
+            threading.Thread(
+                target=_drain_writes,
+                args=(
+                    self._write_queue,
+                    # bound to the paths, not to self, so self can be collected
+                    functools.partial(
+                        _append_lines, self.storage_path, self.filepath, self._file_lock
+                    ),
+                    self.FLUSH_BATCH,
+                    self.FLUSH_INTERVAL
+                ),
+                name="nexaflow-memory-writer",
+                daemon=True
+            ).start()
+            # Runs on close(), garbage collection or interpreter exit
+            self._writer = weakref.finalize(self, _stop_writer, self._write_queue)
     
     def add(self, content: str, category: str = "facts", 
             importance: float = 0.5, tags: List[str] = None):
         """Add item to long-term memory"""
-        if category not in self.memories:
-            self.memories[category] = []
+        # Avoid duplicates
+        if (category, content) in self._seen:
+            return
         
         item = MemoryItem(
             content=content,
@@ -112,12 +326,19 @@ class LongTermMemory:
             importance=importance,
             tags=tags or []
         )
-        
-        # Avoid duplicates
-        existing_contents = [m.content for m in self.memories[category]]
-        if content not in existing_contents:
-            self.memories[category].append(item)
-            self._save()
+        self._insert(item)
+        self._append(item)
+    
+    def _insert(self, item: MemoryItem):
+        """Add an item to the in-memory structures"""
+        category = item.memory_type
+        if category not in self.memories:
+            self.memories[category] = []
+            self._indexes[category] = _KeywordIndex()
+        self.memories[category].append(item)
+        self._indexes[category].add(item)
+        self._seen.add((category, item.content))
+        self._rank_cache = None
     
     def get_category(self, category: str) -> List[MemoryItem]:
         """Get all memories in a category"""
@@ -125,66 +346,364 @@ class LongTermMemory:
     
     def search(self, keyword: str) -> List[MemoryItem]:
         """Search across all categories"""
-        keyword_lower = keyword.lower()
         results = []
-        for category_items in self.memories.values():
-            for item in category_items:
-                if keyword_lower in item.content.lower():
-                    results.append(item)
+        for category in self.memories:
+            results.extend(self._indexes[category].search(keyword))
         return results
     
+    def _ranking_arrays(self) -> tuple:
+        """All items with parallel importance / timestamp arrays (cached)"""
+        if self._rank_cache is None:
+            items = [item for items in self.memories.values() for item in items]
+            importance = [item.importance for item in items]
+            timestamps = [item.timestamp / 1e9 for item in items]  # seconds
+            if np is not None:
+                importance = np.asarray(importance, dtype=np.float64)
+                timestamps = np.asarray(timestamps, dtype=np.float64)
+            self._rank_cache = (items, importance, timestamps)
+        return self._rank_cache
+    
     def get_important(self, min_importance: float = 0.7) -> List[MemoryItem]:
         """Get high-importance memories"""
-        results = []
-        for category_items in self.memories.values():
-            for item in category_items:
-                if item.importance >= min_importance:
-                    results.append(item)
-        return sorted(results, key=lambda x: x.importance, reverse=True)
+        items, importance, _ = self._ranking_arrays()
+        if np is None:
+            results = [item for item in items if item.importance >= min_importance]
+            return sorted(results, key=lambda x: x.importance, reverse=True)
+        
+        idx = np.flatnonzero(importance >= min_importance)
+        return [items[i] for i in idx[np.argsort(-importance[idx], kind="stable")]]
+    
+    def rank(self, k: int = 5, half_life: Optional[float] = None) -> List[MemoryItem]:
+        """
+        Top k memories by importance, optionally decayed by age
+        With half_life (seconds) each score is importance * exp(-age / half_life)
+        """
+        items, importance, timestamps = self._ranking_arrays()
+        scores = importance
+        if half_life is not None:
+            scores = decayed_scores(importance, timestamps, time.time(), half_life)
+        return [items[i] for i in top_k(scores, k)]
+    
+    def _append(self, item: MemoryItem):
+        """Append one item to the store (or queue it for the writer thread)"""
+        line = json_dumps(item.to_dict()) + b"\n"
+        if self._write_queue is not None:
+            self._write_queue.put(line)
+        else:
+            self._write_lines([line])
+    
+    def _write_lines(self, lines: List[bytes]):
+        """Append encoded lines in a single write"""
+        _append_lines(self.storage_path, self.filepath, self._file_lock, lines)
+    
+    def flush(self):
+        """Block until every queued write has reached the file"""
+        if self._write_queue is not None:
+            self._write_queue.join()
+    
+    def close(self):
+        """Flush queued writes and stop the writer thread; later adds write directly"""
+        writer, self._writer = self._writer, None
+        self._write_queue = None
+        if writer is not None:
+            writer()
     
     def _save(self):
-        """Save memories to file"""
-        os.makedirs(self.storage_path, exist_ok=True)
-        filepath = os.path.join(self.storage_path, "long_term.json")
-        
-        data = {}
-        for category, items in self.memories.items():
-            data[category] = [asdict(item) for item in items]
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        """Rewrite the whole store from memory (atomically)"""
+        # Queued appends must land first or they would follow the rewrite
+        self.flush()
+        with self._file_lock:
+            os.makedirs(self.storage_path, exist_ok=True)
+            tmp_path = self.filepath + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                for items in self.memories.values():
+                    for item in items:
+                        f.write(json_dumps(item.to_dict()) + b"\n")
+            os.replace(tmp_path, self.filepath)
+    
+    def compact(self):
+        """Drop duplicate and cleared lines by rewriting the store"""
+        self._save()
     
     def _load(self):
         """Load memories from file"""
-        filepath = os.path.join(self.storage_path, "long_term.json")
+        if not os.path.exists(self.filepath):
+            self._load_legacy()
+            return
         
-        if os.path.exists(filepath):
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                for category, items in data.items():
-                    self.memories[category] = [
-                        MemoryItem(**item) for item in items
-                    ]
-            except (json.JSONDecodeError, TypeError):
-                pass  # Start fresh if file is corrupted
+        lines = redundant = 0
+        with open(self.filepath, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                lines += 1
+                try:
+                    item = MemoryItem.from_dict(json_loads(line))
+                except (json.JSONDecodeError, TypeError, ValueError):
+                    redundant += 1  # e.g. a line torn by a crash mid-write
+                    continue
+                if (item.memory_type, item.content) in self._seen:
+                    redundant += 1
+                    continue
+                self._insert(item)
+        
+        if lines and redundant / lines > self.COMPACT_THRESHOLD:
+            self.compact()
+    
+    def _load_legacy(self):
+        """Import a pre-JSONL long_term.json store, converting it to JSONL"""
+        legacy_path = os.path.join(self.storage_path, self.LEGACY_FILENAME)
+        if not os.path.exists(legacy_path):
+            return
+        
+        try:
+            with open(legacy_path, 'rb') as f:
+                data = json_loads(f.read())
+            
+            for category, items in data.items():
+                self.memories.setdefault(category, [])
+                self._indexes.setdefault(category, _KeywordIndex())
+                for raw in items:
+                    item = MemoryItem.from_dict(raw)
+                    item.memory_type = category
+                    if (category, item.content) not in self._seen:
+                        self._insert(item)
+        except (json.JSONDecodeError, TypeError, ValueError):
+            return  # Start fresh if file is corrupted
+        
+        self._save()
     
     def clear_category(self, category: str):
         """Clear a specific category"""
         if category in self.memories:
             self.memories[category] = []
+            self._indexes[category] = _KeywordIndex()
+            self._seen = {key for key in self._seen if key[0] != category}
+            self._rank_cache = None
             self._save()
 
 
+class SQLiteLongTermMemory:
+    """
+    Long-term memory backed by SQLite
+    Drop-in alternative to LongTermMemory: each add is a single INSERT
+    instead of rewriting the whole JSON file, and keyword search uses an
+    FTS5 trigram index when the SQLite build supports it
+    """
+    
+    DEFAULT_CATEGORIES = ("facts", "learnings", "preferences", "tasks")
+    
+    def __init__(self, storage_path: str = "memory_store"):
+        self.storage_path = storage_path
+        os.makedirs(storage_path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(storage_path, "long_term.db"), check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS memories (
+                id INTEGER PRIMARY KEY,
+                category TEXT NOT NULL,
+                content TEXT NOT NULL,
+                importance REAL NOT NULL,
+                timestamp INTEGER NOT NULL,
+                tags TEXT NOT NULL,
+                UNIQUE (category, content)
+            );
+            CREATE INDEX IF NOT EXISTS memories_importance ON memories (importance);
+        """)
+        self._fts = self._setup_fts()
+        self._conn.commit()
+    
+    def _setup_fts(self) -> bool:
+        """Create the FTS5 trigram index and its sync triggers, if supported"""
+        try:
+            self._conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+                    content, content='memories', content_rowid='id',
+                    tokenize='trigram'
+                );
+                CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+                    INSERT INTO memories_fts (rowid, content) VALUES (new.id, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+                    INSERT INTO memories_fts (memories_fts, rowid, content)
+                    VALUES ('delete', old.id, old.content);
+                END;
+            """)
+            return True
+        except sqlite3.OperationalError:
+            return False  # no FTS5 / trigram tokenizer (SQLite < 3.34)
+    
+    @staticmethod
+    def _row_to_item(row) -> MemoryItem:
+        category, content, importance, timestamp, tags = row
+        return MemoryItem(
+            content=content,
+            memory_type=category,
+            timestamp=timestamp,
+            importance=importance,
+            tags=json_loads(tags)
+        )
+    
+    def _query(self, sql: str, params: tuple = ()) -> List[MemoryItem]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_item(row) for row in rows]
+    
+    def add(self, content: str, category: str = "facts", 
+            importance: float = 0.5, tags: List[str] = None):
+        """Add item to long-term memory (duplicates are ignored)"""
+        item = MemoryItem(
+            content=content,
+            memory_type=category,
+            importance=importance,
+            tags=tags or []
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO memories "
+                "(category, content, importance, timestamp, tags) VALUES (?, ?, ?, ?, ?)",
+                (category, content, importance, item.timestamp, json_dumps(item.tags).decode("utf-8"))
+            )
+            self._conn.commit()
+    
+    def get_category(self, category: str) -> List[MemoryItem]:
+        """Get all memories in a category"""
+        return self._query(
+            "SELECT category, content, importance, timestamp, tags "
+            "FROM memories WHERE category = ? ORDER BY id",
+            (category,)
+        )
+    
+    def search(self, keyword: str) -> List[MemoryItem]:
+        """Case-insensitive substring search across all categories"""
+        if self._fts and len(keyword) >= 3:
+            # Trigram phrase queries match substrings; the Python check
+            # below keeps results identical to LongTermMemory.search
+            candidates = self._query(
+                "SELECT m.category, m.content, m.importance, m.timestamp, m.tags "
+                "FROM memories_fts JOIN memories m ON m.id = memories_fts.rowid "
+                "WHERE memories_fts MATCH ? ORDER BY m.id",
+                ('"' + keyword.replace('"', '""') + '"',)
+            )
+        else:
+            candidates = self._query(
+                "SELECT category, content, importance, timestamp, tags "
+                "FROM memories ORDER BY id"
+            )
+        keyword_lower = keyword.lower()
+        return [item for item in candidates if keyword_lower in item.content_lower]
+    
+    def get_important(self, min_importance: float = 0.7) -> List[MemoryItem]:
+        """Get high-importance memories"""
+        return self._query(
+            "SELECT category, content, importance, timestamp, tags "
+            "FROM memories WHERE importance >= ? ORDER BY importance DESC, id",
+            (min_importance,)
+        )
+    
+    def rank(self, k: int = 5, half_life: Optional[float] = None) -> List[MemoryItem]:
+        """
+        Top k memories by importance, optionally decayed by age
+        With half_life (seconds) each score is importance * exp(-age / half_life)
+        """
+        if k <= 0:
+            return []
+        if half_life is None:
+            return self._query(
+                "SELECT category, content, importance, timestamp, tags "
+                "FROM memories ORDER BY importance DESC, id LIMIT ?",
+                (k,)
+            )
+        
+        # Decay needs exp(), which not every SQLite build has: score the
+        # (importance, timestamp) columns here, then load only the winners
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, importance, timestamp FROM memories ORDER BY id"
+            ).fetchall()
+        if not rows:
+            return []
+        ids, importance, timestamps = zip(*rows)
+        scores = decayed_scores(
+            importance, [ts / 1e9 for ts in timestamps], time.time(), half_life
+        )
+        best = [ids[i] for i in top_k(scores, k)]
+        by_id = {}
+        with self._lock:
+            for row in self._conn.execute(
+                "SELECT id, category, content, importance, timestamp, tags "
+                f"FROM memories WHERE id IN ({','.join('?' * len(best))})",
+                best
+            ):
+                by_id[row[0]] = self._row_to_item(row[1:])
+        return [by_id[i] for i in best]
+    
+    @property
+    def memories(self) -> Dict[str, List[MemoryItem]]:
+        """Snapshot of all memories grouped by category (LongTermMemory layout)"""
+        grouped: Dict[str, List[MemoryItem]] = {c: [] for c in self.DEFAULT_CATEGORIES}
+        for item in self._query(
+            "SELECT category, content, importance, timestamp, tags FROM memories ORDER BY id"
+        ):
+            grouped.setdefault(item.memory_type, []).append(item)
+        return grouped
+    
+    def clear_category(self, category: str):
+        """Clear a specific category"""
+        with self._lock:
+            self._conn.execute("DELETE FROM memories WHERE category = ?", (category,))
+            self._conn.commit()
+    
+    def export_json(self, filepath: str):
+        """Write all memories in the LongTermMemory JSON format"""
+        data = {
+            category: [item.to_dict() for item in items]
+            for category, items in self.memories.items()
+        }
+        with open(filepath, 'wb') as f:
+            f.write(json_dumps(data, indent=True))
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
 class MemoryManager:
     """
     Unified memory manager combining short-term and long-term memory
     """
     
-    def __init__(self, storage_path: str = "memory_store"):
+    # Semantic recall switches to the FAISS HNSW index (when installed)
+    # once this many memories exist; below it the exact scan is faster
+    ANN_MIN_ITEMS = 1024
+    
+    def __init__(
+        self,
+        storage_path: str = "memory_store",
+        embedder: Optional[Embedder] = None,
+        backend: str = "json",
+        background_writes: bool = False
+    ):
         self.short_term = ShortTermMemory()
-        self.long_term = LongTermMemory(storage_path)
+        # "json" rewrites one file per add; "sqlite" inserts a single row
+        if backend == "sqlite":
+            self.long_term = SQLiteLongTermMemory(storage_path)
+        elif backend == "json":
+            self.long_term = LongTermMemory(storage_path, background_writes=background_writes)
+        else:
+            raise ValueError(f"Unknown memory backend: {backend}")
+        
+        # Optional semantic recall: embeddings cached per content string
+        self.embedder = embedder
+        self._embeddings: Dict[str, Any] = {}
+        self._matrix = None
+        self._matrix_contents: List[str] = []
+        self._ann: Optional[ANNIndex] = None
     
     def remember(self, content: str, importance: float = 0.5, 
                  tags: List[str] = None):
@@ -203,6 +722,18 @@ class MemoryManager:
     
     def recall(self, query: str, max_results: int = 5) -> List[MemoryItem]:
         """Search both memory systems"""
+        if self.embedder is not None:
+            return self._semantic_recall(query, max_results)
+        
+        unique = self._keyword_matches(query)
+        
+        # Highest importance first (partial selection, not a full sort)
+        return [
+            unique[i] for i in top_k([item.importance for item in unique], max_results)
+        ]
+    
+    def _keyword_matches(self, query: str) -> List[MemoryItem]:
+        """Substring matches from both memory systems, deduplicated"""
         short_results = self.short_term.search(query)
         long_results = self.long_term.search(query)
         
@@ -214,12 +745,62 @@ class MemoryManager:
             if item.content not in seen:
                 seen.add(item.content)
                 unique.append(item)
+        return unique
+    
+    def _semantic_recall(self, query: str, max_results: int) -> List[MemoryItem]:
+        """Rank every memory by embedding similarity to the query"""
+        # content -> first item with it, in recall order; this one pass also
+        # finds new memories to embed and resolves ANN hits below
+        live: Dict[str, MemoryItem] = {}
+        for item in self.short_term.items:
+            live.setdefault(item.content, item)
+        for category_items in self.long_term.memories.values():
+            for item in category_items:
+                live.setdefault(item.content, item)
+        
+        if not live:
+            return []
         
-        # Sort by importance
-        unique.sort(key=lambda x: x.importance, reverse=True)
-        return unique[:max_results]
+        for content in live:
+            if content not in self._embeddings:
+                self._embeddings[content] = self.embedder.encode(content)
+        query_vector = self.embedder.encode(query)
+        
+        if len(live) >= self.ANN_MIN_ITEMS and ANNIndex.available():
+            return self._ann_recall(live, query_vector, max_results)
+        
+        # Re-stack the embedding matrix only when the memory set changed
+        contents = list(live)
+        if self._matrix is None or contents != self._matrix_contents:
+            self._matrix = stack_vectors([self._embeddings[c] for c in contents])
+            self._matrix_contents = contents
+        
+        indices, _ = cosine_topk(self._matrix, query_vector, max_results)
+        return [live[contents[i]] for i in indices]
+    
+    def _ann_recall(self, live: Dict[str, MemoryItem], query_vector: Any,
+                    max_results: int) -> List[MemoryItem]:
+        """Approximate semantic recall through the HNSW index"""
+        if self._ann is None:
+            self._ann = ANNIndex(len(query_vector))
+        
+        new = [c for c in live if c not in self._ann]
+        self._ann.add(new, [self._embeddings[c] for c in new])
+        
+        # Rows are never deleted, so over-fetch to skip forgotten memories
+        results = []
+        for content, _ in self._ann.search(query_vector, max_results * 4):
+            item = live.get(content)
+            if item is not None:
+                results.append(item)
+                if len(results) == max_results:
+                    break
+        return results
     
     def get_context(self) -> str:
         """Get formatted context string for LLM prompts"""
         return self.short_term.to_context_string()
 
+
+# Short name used by the package exports
+Memory = MemoryManager
@@ -4,20 +4,51 @@ Manages multiple agents working together on complex tasks
 Like a conductor leading an orchestra of AI agents
 """
 
+import asyncio
+import contextlib
+import hashlib
 import json
-from typing import List, Dict, Optional, Any
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional, Any
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
+from ._compat import json_dumps
 from .agent import Agent
+from .cache import LRUCache
 from .llm import LLMClient
 from .tools import ToolRegistry
 from .memory import MemoryManager
 
 
-class TaskStatus(Enum):
-    """Status of a task"""
+_WORD_RE = re.compile(r"[A-Za-z_]\w{3,}")
+
+
+def _summarize_result(result: str, edge: int = 100, keywords: int = 5) -> str:
+    """Cheap local digest of a long result: head, tail and top keywords"""
+    top = [word for word, _ in Counter(
+        word.lower() for word in _WORD_RE.findall(result)
+    ).most_common(keywords)]
+    return (
+        f"{result[:edge].strip()} ... {result[-edge:].strip()} "
+        f"(keywords: {', '.join(top)}; {len(result)} chars)"
+    )
+
+
+def _iso(ns: Optional[int]) -> Optional[str]:
+    """Format a time.time_ns() stamp as a local ISO timestamp"""
+    if ns is None:
+        return None
+    return datetime.fromtimestamp(ns / 1e9).isoformat()
+
+
+class TaskStatus(str, Enum):
+    """Status of a task (a str, so it serializes as its value)"""
     PENDING = "pending"
     RUNNING = "running"
     COMPLETED = "completed"
@@ -33,10 +64,10 @@ class Task:
     status: TaskStatus = TaskStatus.PENDING
     result: Optional[str] = None
     dependencies: List[str] = field(default_factory=list)
-    created_at: str = field(
-        default_factory=lambda: datetime.now().isoformat()
-    )
-    completed_at: Optional[str] = None
+    # time.time_ns() stamps; formatted as ISO strings only in to_dict
+    created_at: int = field(default_factory=time.time_ns)
+    completed_at: Optional[int] = None
+    summary: Optional[str] = None  # digest of a long result for dependents
     
     def to_dict(self) -> Dict:
         return {
@@ -46,8 +77,8 @@ class Task:
             "status": self.status.value,
             "result": self.result,
             "dependencies": self.dependencies,
-            "created_at": self.created_at,
-            "completed_at": self.completed_at
+            "created_at": _iso(self.created_at),
+            "completed_at": _iso(self.completed_at)
         }
 
 
@@ -74,12 +105,28 @@ class Orchestrator:
     4. Hierarchical - manager agent delegates to workers
     """
     
-    def __init__(self, verbose: bool = True):
+    SUMMARY_THRESHOLD = 1000  # results longer than this get a digest
+    DEPENDENCY_CONTEXT_BUDGET = 2000  # chars of inlined dependency results
+    
+    def __init__(
+        self,
+        verbose: bool = True,
+        use_result_cache: bool = False,
+        result_cache: Optional[LRUCache] = None
+    ):
         self.agents: Dict[str, Agent] = {}
         self.tasks: Dict[str, Task] = {}
         self.verbose = verbose
         self.shared_memory = MemoryManager()
         self.workflow_history: List[WorkflowResult] = []
+        # Serializes result bookkeeping when a frontier runs on threads
+        self._state_lock = threading.Lock()
+        
+        # Reuse results of identical (agent, prompt) runs; any object with
+        # get(key) / put(key, value) can stand in for the LRU cache
+        if result_cache is None and use_result_cache:
+            result_cache = LRUCache(max_size=256)
+        self.result_cache = result_cache
     
     def _log(self, message: str):
         """Print if verbose"""
@@ -107,8 +154,7 @@ class Orchestrator:
             name=name,
             role=role,
             llm=llm or LLMClient(),
-            tools=tools or ToolRegistry(),
-            memory=MemoryManager()
+            tools=tools or ToolRegistry()
         )
         self.add_agent(agent)
         return agent
@@ -124,7 +170,7 @@ class Orchestrator:
     def remove_agent(self, name: str) -> bool:
         """Remove an agent"""
         if name in self.agents:
-            del self.agents[name]
+            self.agents.pop(name).close()
             return True
         return False
     
@@ -162,28 +208,34 @@ class Orchestrator:
         if not task.dependencies:
             return ""
         
-        context_parts = ["Previous results:"]
+        deps = []
         for dep_id in task.dependencies:
             dep_task = self.tasks.get(dep_id)
             if dep_task and dep_task.result:
-                context_parts.append(
-                    f"- [{dep_id}]: {dep_task.result[:500]}"
-                )
+                deps.append(dep_task)
+        
+        # Past the budget, long results are replaced by their digests
+        inline = sum(min(len(dep.result), 500) for dep in deps)
+        use_summary = inline > self.DEPENDENCY_CONTEXT_BUDGET
+        
+        context_parts = ["Previous results:"]
+        for dep in deps:
+            text = dep.summary if use_summary and dep.summary else dep.result[:500]
+            context_parts.append(f"- [{dep.id}]: {text}")
         
         return "\n".join(context_parts)
     
-    def _run_task(self, task: Task) -> bool:
-        """Execute a single task"""
+    def _prepare_task(self, task: Task) -> Optional[tuple]:
+        """Pick the agent and gather the prompt parts: (agent, task, context)"""
         agent_name = task.assigned_agent
         
         if not agent_name or agent_name not in self.agents:
-            # Use first available agent
-            if self.agents:
-                agent_name = list(self.agents.keys())[0]
-            else:
+            # Use first available agent (dicts keep insertion order)
+            agent_name = next(iter(self.agents), None)
+            if agent_name is None:
                 task.status = TaskStatus.FAILED
                 task.result = "No agents available"
-                return False
+                return None
         
         agent = self.agents[agent_name]
         task.status = TaskStatus.RUNNING
@@ -191,19 +243,16 @@ class Orchestrator:
         
         self._log(f"\n  🔄 Running task '{task.id}' with agent '{agent_name}'")
         
-        try:
-            # Build task with dependency context
-            dep_context = self._get_dependency_context(task)
-            full_task = task.description
-            if dep_context:
-                full_task = f"{task.description}\n\n{dep_context}"
-            
-            # Execute
-            result = agent.run(full_task)
-            
+        # Build task with dependency context
+        dep_context = self._get_dependency_context(task)
+        return agent, task.description, dep_context or None
+    
+    def _complete_task(self, task: Task, result: str):
+        """Record a successful task result"""
+        with self._state_lock:
             task.status = TaskStatus.COMPLETED
             task.result = result
-            task.completed_at = datetime.now().isoformat()
+            task.completed_at = time.time_ns()
             
             # Store in shared memory
             self.shared_memory.remember(
@@ -211,58 +260,258 @@ class Orchestrator:
                 importance=0.8
             )
             
-            self._log(f"  ✅ Task '{task.id}' completed")
+            if len(result) > self.SUMMARY_THRESHOLD:
+                task.summary = _summarize_result(result)
+                self.shared_memory.remember(
+                    f"Task '{task.id}' summary: {task.summary}",
+                    importance=0.5,
+                    tags=[task.id]
+                )
+        
+        self._log(f"  ✅ Task '{task.id}' completed")
+    
+    def _fail_task(self, task: Task, error: Exception):
+        """Record a failed task"""
+        task.status = TaskStatus.FAILED
+        task.result = f"Error: {str(error)}"
+        self._log(f"  ❌ Task '{task.id}' failed: {str(error)}")
+    
+    @staticmethod
+    def _result_key(agent: Agent, description: str, context: Optional[str]) -> str:
+        """Result cache key for an agent / prompt pair"""
+        return hashlib.blake2b(
+            f"{agent.name}\0{description}\0{context or ''}".encode("utf-8"),
+            digest_size=16
+        ).hexdigest()
+    
+    def _cached_result(self, agent: Agent, description: str, context: Optional[str]) -> tuple:
+        """Look up the result cache: (key, cached_result)"""
+        if self.result_cache is None:
+            return None, None
+        key = self._result_key(agent, description, context)
+        with self._state_lock:
+            return key, self.result_cache.get(key)
+    
+    def _store_result(self, key: Optional[str], result: str):
+        if key is not None:
+            with self._state_lock:
+                self.result_cache.put(key, result)
+    
+    def _run_task(self, task: Task, locks: Optional[Dict[str, threading.Lock]] = None) -> bool:
+        """Execute a single task"""
+        prepared = self._prepare_task(task)
+        if prepared is None:
+            return False
+        agent, description, context = prepared
+        
+        key, cached = self._cached_result(agent, description, context)
+        if cached is not None:
+            self._log(f"  ⚡ Task '{task.id}' served from result cache")
+            self._complete_task(task, cached)
+            return True
+        
+        try:
+            # An agent keeps per-run state, so it handles one task at a time
+            lock = locks.get(agent.name) if locks else None
+            with lock or contextlib.nullcontext():
+                result = agent.run(description, context=context)
+            self._store_result(key, result)
+            self._complete_task(task, result)
             return True
             
         except Exception as e:
-            task.status = TaskStatus.FAILED
-            task.result = f"Error: {str(e)}"
-            self._log(f"  ❌ Task '{task.id}' failed: {str(e)}")
+            self._fail_task(task, e)
+            return False
+    
+    async def _arun_task(self, task: Task, locks: Dict[str, asyncio.Lock]) -> bool:
+        """Execute a single task with Agent.arun"""
+        prepared = self._prepare_task(task)
+        if prepared is None:
+            return False
+        agent, description, context = prepared
+        
+        key, cached = self._cached_result(agent, description, context)
+        if cached is not None:
+            self._log(f"  ⚡ Task '{task.id}' served from result cache")
+            self._complete_task(task, cached)
+            return True
+        
+        try:
+            # An agent keeps per-run state, so it handles one task at a time
+            async with locks.setdefault(agent.name, asyncio.Lock()):
+                result = await agent.arun(description, context=context)
+            self._store_result(key, result)
+            self._complete_task(task, result)
+            return True
+        
+        except Exception as e:
+            self._fail_task(task, e)
             return False
     
+    def _topological_frontiers(self, tasks: List[Task]) -> Iterator[List[Task]]:
+        """
+        Kahn's algorithm over the tasks' dependencies
+        Yields successive frontiers: every task in a frontier depends only
+        on tasks from earlier frontiers (or outside the run), so a frontier
+        can run concurrently. Tasks stuck in a cycle come last and then
+        fail their dependency check.
+        """
+        position = {task.id: i for i, task in enumerate(tasks)}
+        indegree = {task.id: 0 for task in tasks}
+        successors: Dict[str, List[Task]] = {task.id: [] for task in tasks}
+        for task in tasks:
+            for dep_id in set(task.dependencies):
+                if dep_id in position and dep_id != task.id:
+                    indegree[task.id] += 1
+                    successors[dep_id].append(task)
+        
+        frontier = [task for task in tasks if indegree[task.id] == 0]
+        scheduled = 0
+        while frontier:
+            yield frontier
+            scheduled += len(frontier)
+            ready = []
+            for task in frontier:
+                for succ in successors[task.id]:
+                    indegree[succ.id] -= 1
+                    if indegree[succ.id] == 0:
+                        ready.append(succ)
+            frontier = sorted(ready, key=lambda t: position[t.id])
+        
+        if scheduled < len(tasks):
+            yield [task for task in tasks if indegree[task.id] > 0]
+    
+    def _run_frontier(self, tasks: List[Task]) -> List[bool]:
+        """Run independent tasks, concurrently on threads when there are several"""
+        if len(tasks) <= 1:
+            return [self._run_task(task) for task in tasks]
+        
+        locks = {name: threading.Lock() for name in self.agents}
+        workers = min(len(tasks), max(len(self.agents), 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda task: self._run_task(task, locks), tasks))
+    
     # ========================================================
     # Workflow Patterns
     # ========================================================
     
     def run_sequential(self, tasks: Optional[List[str]] = None) -> WorkflowResult:
         """
-        Run tasks one after another
-        Each task can use results from previous tasks
+        Run tasks in dependency order
+        Each task can use results from the tasks it depends on; tasks
+        with no dependency path between them run concurrently
         """
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         self._log(f"\n{'='*60}")
         self._log(f"  🎼 Sequential Workflow Starting")
-        self._log(f"  Agents: {self.list_agents()}")
+        if self.verbose:
+            self._log(f"  Agents: {self.list_agents()}")
         self._log(f"{'='*60}")
         
         task_ids = tasks or list(self.tasks.keys())
+        known, failed = self._known_tasks(task_ids)
         completed = 0
-        failed = 0
-        results = {}
         
+        done = set()
+        for frontier in self._topological_frontiers(known):
+            runnable, blocked = self._runnable_tasks(frontier)
+            failed += blocked
+            
+            for task, ok in zip(runnable, self._run_frontier(runnable)):
+                if ok:
+                    completed += 1
+                    done.add(task.id)
+                else:
+                    failed += 1
+        
+        # Report results in the order the tasks were given
+        results = {task.id: task.result or "" for task in known if task.id in done}
+        
+        return self._finish_workflow(
+            task_ids, completed, failed, results, start_time
+        )
+    
+    async def arun_sequential(self, tasks: Optional[List[str]] = None) -> WorkflowResult:
+        """
+        Async version of run_sequential
+        Each dependency frontier is awaited with asyncio.gather, so
+        independent tasks share the event loop instead of threads
+        """
+        start_time = time.perf_counter()
+        
+        self._log(f"\n{'='*60}")
+        self._log(f"  🎼 Sequential Workflow Starting (async)")
+        if self.verbose:
+            self._log(f"  Agents: {self.list_agents()}")
+        self._log(f"{'='*60}")
+        
+        task_ids = tasks or list(self.tasks.keys())
+        known, failed = self._known_tasks(task_ids)
+        completed = 0
+        
+        done = set()
+        locks: Dict[str, asyncio.Lock] = {}
+        for frontier in self._topological_frontiers(known):
+            runnable, blocked = self._runnable_tasks(frontier)
+            failed += blocked
+            
+            outcomes = await asyncio.gather(
+                *(self._arun_task(task, locks) for task in runnable),
+                return_exceptions=True
+            )
+            for task, ok in zip(runnable, outcomes):
+                if ok is True:
+                    completed += 1
+                    done.add(task.id)
+                else:
+                    failed += 1
+        
+        # Report results in the order the tasks were given
+        results = {task.id: task.result or "" for task in known if task.id in done}
+        
+        return self._finish_workflow(
+            task_ids, completed, failed, results, start_time
+        )
+    
+    def _known_tasks(self, task_ids: List[str]) -> tuple:
+        """Resolve task ids: (tasks, number of missing ids)"""
+        known = []
+        missing = 0
         for task_id in task_ids:
             task = self.tasks.get(task_id)
             if not task:
                 self._log(f"  ⚠️  Task '{task_id}' not found")
-                failed += 1
+                missing += 1
                 continue
-            
+            known.append(task)
+        return known, missing
+    
+    def _runnable_tasks(self, frontier: List[Task]) -> tuple:
+        """Split a frontier: (runnable tasks, number blocked on dependencies)"""
+        runnable = []
+        blocked = 0
+        for task in frontier:
             # Check dependencies
             if not self._can_run_task(task):
-                self._log(f"  ⏳ Task '{task_id}' waiting for dependencies")
+                self._log(f"  ⏳ Task '{task.id}' waiting for dependencies")
                 task.status = TaskStatus.FAILED
                 task.result = "Dependencies not met"
-                failed += 1
+                blocked += 1
                 continue
-            
-            if self._run_task(task):
-                completed += 1
-                results[task_id] = task.result or ""
-            else:
-                failed += 1
-        
-        duration = (datetime.now() - start_time).total_seconds()
+            runnable.append(task)
+        return runnable, blocked
+    
+    def _finish_workflow(
+        self,
+        task_ids: List[str],
+        completed: int,
+        failed: int,
+        results: Dict[str, str],
+        start_time: float
+    ) -> WorkflowResult:
+        """Build, record and log the result of a workflow run"""
+        duration = time.perf_counter() - start_time
         
         # Generate summary
         summary = self._generate_summary(results)
@@ -287,6 +536,58 @@ class Orchestrator:
         
         return workflow_result
     
+    async def run_parallel(self, tasks: Optional[List[str]] = None) -> WorkflowResult:
+        """
+        Run tasks concurrently with asyncio
+        Independent tasks wait on their LLM calls at the same time,
+        so N tasks take about as long as the slowest one
+        """
+        start_time = time.perf_counter()
+        
+        self._log(f"\n{'='*60}")
+        self._log(f"  ⚡ Parallel Workflow Starting")
+        if self.verbose:
+            self._log(f"  Agents: {self.list_agents()}")
+        self._log(f"{'='*60}")
+        
+        task_ids = tasks or list(self.tasks.keys())
+        failed = 0
+        runnable = []
+        
+        for task_id in task_ids:
+            task = self.tasks.get(task_id)
+            if not task:
+                self._log(f"  ⚠️  Task '{task_id}' not found")
+                failed += 1
+                continue
+            
+            if not self._can_run_task(task):
+                self._log(f"  ⏳ Task '{task_id}' waiting for dependencies")
+                task.status = TaskStatus.FAILED
+                task.result = "Dependencies not met"
+                failed += 1
+                continue
+            
+            runnable.append(task)
+        
+        locks: Dict[str, asyncio.Lock] = {}
+        outcomes = await asyncio.gather(
+            *(self._arun_task(task, locks) for task in runnable)
+        )
+        
+        completed = 0
+        results = {}
+        for task, ok in zip(runnable, outcomes):
+            if ok:
+                completed += 1
+                results[task.id] = task.result or ""
+            else:
+                failed += 1
+        
+        return self._finish_workflow(
+            task_ids, completed, failed, results, start_time
+        )
+    
     def run_pipeline(
         self,
         task_descriptions: List[str],
@@ -398,8 +699,10 @@ class Orchestrator:
         
         parts = ["Workflow Summary:"]
         for task_id, result in results.items():
-            short_result = result[:200] if result else "No output"
-            parts.append(f"  [{task_id}]: {short_result}")
+            if result:
+                parts.append("  [%s]: %.200s" % (task_id, result))
+            else:
+                parts.append(f"  [{task_id}]: No output")
         
         return "\n".join(parts)
     
@@ -414,11 +717,16 @@ class Orchestrator:
             "workflows_completed": len(self.workflow_history)
         }
     
+    def get_status_json(self, indent: bool = False) -> bytes:
+        """get_status serialized to JSON bytes (orjson when installed)"""
+        return json_dumps(self.get_status(), indent=indent)
+    
     def reset(self):
         """Reset all tasks"""
         self.tasks.clear()
         for agent in self.agents.values():
             agent.reset()
+            agent.close()
     
     def __repr__(self):
         return (
@@ -3,15 +3,26 @@ Tool system for NexaFlow agents
 Agents can use these tools to interact with the real world
 """
 
-import json
+import ast
+import asyncio
+import codecs
+import functools
+import hashlib
+import inspect
 import math
+import operator
 import os
-from typing import Dict, Any, Callable, Optional, List
-from dataclasses import dataclass, asdict
+import string
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional, List, Tuple
+from dataclasses import dataclass, asdict, field, replace
 from datetime import datetime
 
+from ._compat import DATACLASS_SLOTS, json_dumps
+from .cache import LRUCache
 
-@dataclass
+
+@dataclass(**DATACLASS_SLOTS)
 class ToolResult:
     """Result from a tool execution"""
     success: bool
@@ -19,13 +30,44 @@ class ToolResult:
     error: Optional[str] = None
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Tool:
     """Represents a tool that an agent can use"""
     name: str
     description: str
     parameters: Dict[str, Any]
     function: Optional[Callable] = None
+    # Deterministic tools can reuse outputs for identical arguments
+    cacheable: bool = False
+    cache_size: int = 256
+    cache_ttl: Optional[float] = 3600.0  # seconds; None keeps entries until evicted
+    _cache: Optional[LRUCache] = field(default=None, init=False, repr=False, compare=False)
+    # Parameter names -> types as JSON, rendered once for prompt building
+    _params_json: str = field(default="", init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        properties = (self.parameters or {}).get("properties") or {}
+        if properties:
+            self._params_json = json_dumps({
+                name: spec.get("type", "any") if isinstance(spec, dict) else "any"
+                for name, spec in properties.items()
+            }).decode("utf-8")
+        if self.cacheable:
+            self._cache = LRUCache(max_size=self.cache_size, ttl=self.cache_ttl)
+    
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Cache hits and misses (zeros when the tool is not cacheable)"""
+        if self._cache is None:
+            return {"hits": 0, "misses": 0}
+        return {"hits": self._cache.hits, "misses": self._cache.misses}
+    
+    def _cache_key(self, kwargs: Dict[str, Any]) -> Optional[bytes]:
+        if self._cache is None:
+            return None
+        return hashlib.sha256(
+            json_dumps([self.name, kwargs], sort_keys=True, default=str)
+        ).digest()
     
     def to_openai_format(self) -> Dict:
         """Convert to OpenAI function calling format"""
@@ -46,65 +88,276 @@ class Tool:
                 output="", 
                 error="No function attached to tool"
             )
+        key = self._cache_key(kwargs)
+        if key is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return ToolResult(success=True, output=cached)
         try:
-            result = self.function(**kwargs)
-            return ToolResult(success=True, output=str(result))
+            output = str(self.function(**kwargs))
+            if key is not None:
+                self._cache.put(key, output)
+            return ToolResult(success=True, output=output)
         except Exception as e:
             return ToolResult(
                 success=False, 
                 output="", 
                 error=str(e)
             )
+    
+    async def aexecute(self, **kwargs) -> ToolResult:
+        """
+        Execute the tool without blocking the event loop
+        Coroutine functions are awaited, sync ones run in a worker thread
+        """
+        if not inspect.iscoroutinefunction(self.function):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, functools.partial(self.execute, **kwargs)
+            )
+        key = self._cache_key(kwargs)
+        if key is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return ToolResult(success=True, output=cached)
+        try:
+            output = str(await self.function(**kwargs))
+            if key is not None:
+                self._cache.put(key, output)
+            return ToolResult(success=True, output=output)
+        except Exception as e:
+            return ToolResult(
+                success=False, 
+                output="", 
+                error=str(e)
+            )
+
+
+@dataclass(**DATACLASS_SLOTS)
+class AsyncTool(Tool):
+    """
+    A tool backed by a coroutine function (e.g. an aiohttp/httpx call)
+    aexecute awaits it on the caller's loop; execute drives it to
+    completion so the tool also works from sync agents
+    """
+    
+    def __post_init__(self):
+        if not inspect.iscoroutinefunction(self.function):
+            raise TypeError(f"AsyncTool '{self.name}' needs an async def function")
+        # Explicit base call: zero-arg super() breaks in slotted dataclasses
+        Tool.__post_init__(self)
+    
+    def execute(self, **kwargs) -> ToolResult:
+        """Run the coroutine to completion (not from inside a running loop)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aexecute(**kwargs))
+        return ToolResult(
+            success=False,
+            output="",
+            error=f"AsyncTool '{self.name}' must be awaited with aexecute inside an event loop"
+        )
 
 
 # ============================================================
 # Built-in Tools
 # ============================================================
 
+# Largest power result allowed, in bits (~300k decimal digits)
+_MAX_POW_BITS = 1_000_000
+
+
+def _safe_pow(base, exponent, *mod):
+    """pow() that refuses results big enough to hang the process"""
+    # log2 of the result's magnitude is exponent * log2(|base|); modular
+    # pow stays small and complex exponents are plain float math
+    if not mod and not isinstance(exponent, complex) and abs(base) not in (0, 1):
+        if exponent * math.log2(abs(base)) > _MAX_POW_BITS:
+            raise ValueError("power result is too large")
+    return pow(base, exponent, *mod)
+
+
+_CALC_NAMES = {
+    "abs": abs, "round": round,
+    "min": min, "max": max,
+    "sum": sum, "pow": _safe_pow,
+    "sqrt": math.sqrt,
+    "sin": math.sin, "cos": math.cos,
+    "tan": math.tan, "pi": math.pi,
+    "e": math.e, "log": math.log,
+    "log10": math.log10,
+}
+
+_CALC_BINARY = {
+    ast.Add: operator.add, ast.Sub: operator.sub,
+    ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+    ast.Pow: _safe_pow,
+}
+
+_CALC_UNARY = {ast.USub: operator.neg, ast.UAdd: operator.pos}
+
+
+# Literal sequences are only allowed as direct arguments of these, e.g.
+# sum([1, 2, 3]); anywhere else [1] * 10**9 would be a valid expression
+_CALC_SEQUENCE_FUNCS = frozenset({"sum", "min", "max"})
+
+
+def _build_sequence(node: ast.AST) -> Callable[[], Any]:
+    """Closure building a list / tuple literal of whitelisted items"""
+    build = list if isinstance(node, ast.List) else tuple
+    items = [_build_expression(elt) for elt in node.elts]
+    return lambda: build(item() for item in items)
+
+
+def _build_expression(node: ast.AST) -> Callable[[], Any]:
+    """Turn a whitelisted AST node into a closure that evaluates it"""
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if isinstance(value, bool) or not isinstance(value, (int, float, complex)):
+            raise ValueError(f"{value!r} is not allowed")
+        return lambda: value
+    
+    if isinstance(node, ast.Name):
+        if node.id not in _CALC_NAMES:
+            raise ValueError(f"'{node.id}' is not allowed")
+        value = _CALC_NAMES[node.id]
+        return lambda: value
+    
+    if isinstance(node, ast.BinOp) and type(node.op) in _CALC_BINARY:
+        op = _CALC_BINARY[type(node.op)]
+        left, right = _build_expression(node.left), _build_expression(node.right)
+        return lambda: op(left(), right())
+    
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _CALC_UNARY:
+        op = _CALC_UNARY[type(node.op)]
+        operand = _build_expression(node.operand)
+        return lambda: op(operand())
+    
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.keywords:
+            raise ValueError("only plain calls to math functions are allowed")
+        func = _build_expression(node.func)
+        takes_sequence = node.func.id in _CALC_SEQUENCE_FUNCS
+        args = [
+            _build_sequence(arg) if takes_sequence and isinstance(arg, (ast.List, ast.Tuple))
+            else _build_expression(arg)
+            for arg in node.args
+        ]
+        return lambda: func()(*[arg() for arg in args])
+    
+    name = type(getattr(node, "op", node)).__name__
+    raise ValueError(f"'{name}' is not allowed")
+
+
+# Deletes every character a valid expression can contain; anything left
+# over is rejected before parsing (str.translate runs in C)
+_CALC_STRIP = str.maketrans("", "", "0123456789.+-*/%()[], \t\n" + string.ascii_letters)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_expression(expression: str) -> Callable[[], Any]:
+    """Parse and validate a calculator expression once, returning its evaluator"""
+    leftover = expression.translate(_CALC_STRIP)
+    if leftover:
+        raise ValueError(f"character {leftover[0]!r} is not allowed")
+    tree = ast.parse(expression, mode="eval").body
+    evaluate = _build_expression(tree)
+    
+    # Constant-only expressions (no names or calls) are folded now, so the
+    # cached evaluator just returns the result
+    if not any(isinstance(node, (ast.Name, ast.Call)) for node in ast.walk(tree)):
+        try:
+            value = evaluate()
+        except Exception:
+            return evaluate  # e.g. 1/0: the error is raised on each call
+        return lambda: value
+    return evaluate
+
+
 def calculator(expression: str) -> str:
     """Safe mathematical calculator"""
-    allowed_names = {
-        "abs": abs, "round": round,
-        "min": min, "max": max,
-        "sum": sum, "pow": pow,
-        "sqrt": math.sqrt,
-        "sin": math.sin, "cos": math.cos,
-        "tan": math.tan, "pi": math.pi,
-        "e": math.e, "log": math.log,
-        "log10": math.log10,
-    }
+    try:
+        # Safety: only whitelisted nodes and math names are accepted,
+        # and nothing is passed to eval
+        evaluate = _compile_expression(expression)
+    except ValueError as e:
+        return f"Error: {e}"
+    except (SyntaxError, RecursionError, MemoryError) as e:
+        # e.g. "-" * 5000 + "1" nests deeper than the parser / builder allow
+        return f"Calculation error: {str(e) or type(e).__name__}"
     
     try:
-        # Safety: only allow math operations
-        code = compile(expression, "<string>", "eval")
-        for name in code.co_names:
-            if name not in allowed_names:
-                return f"Error: '{name}' is not allowed"
-        
-        result = eval(expression, {"__builtins__": {}}, allowed_names)
+        result = evaluate()
         return f"{expression} = {result}"
     except Exception as e:
-        return f"Calculation error: {str(e)}"
+        return f"Calculation error: {str(e) or type(e).__name__}"
+
+
+_READ_FILE_LIMIT = 5000
+_READ_FILE_BYTES = (_READ_FILE_LIMIT + 1) * 4
+
+
+@functools.lru_cache(maxsize=128)
+def _read_file_cached(filepath: str, device: int, inode: int, mtime_ns: int, size: int) -> str:
+    """Read and truncate a file; the stat fields only key the cache"""
+    # One raw read of enough bytes for limit + 1 characters (UTF-8 uses
+    # at most 4 per character) and a single decode, instead of the
+    # buffered text layer decoding chunk by chunk
+    fd = os.open(filepath, os.O_RDONLY)
+    try:
+        data = os.read(fd, _READ_FILE_BYTES)
+    finally:
+        os.close(fd)
+    
+    # A read cut short by the byte cap may end inside a character
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    content = decoder.decode(data, final=len(data) < _READ_FILE_BYTES)
+    if "\r" in content:
+        # Same newline handling as text-mode open()
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    
+    # Limit output size
+    if len(content) > _READ_FILE_LIMIT:
+        content = content[:_READ_FILE_LIMIT] + "\n... (truncated)"
+    
+    return content
 
 
 def read_file(filepath: str) -> str:
-    """Read content from a file"""
+    """Read content from a file (unchanged files come from a stat-keyed cache)"""
     try:
-        if not os.path.exists(filepath):
-            return f"Error: File '{filepath}' not found"
-        
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Limit output size
-        if len(content) > 5000:
-            content = content[:5000] + "\n... (truncated)"
-        
-        return content
+        st = os.stat(filepath)
+        return _read_file_cached(
+            filepath, st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size
+        )
+    except FileNotFoundError:
+        return f"Error: File '{filepath}' not found"
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
 
+_BATCH_READ_WORKERS = 8
+
+
+def batch_read_files(filepaths: Any) -> str:
+    """Read several files at once; output has one section per file"""
+    if isinstance(filepaths, str):
+        filepaths = [p.strip() for p in filepaths.split(",") if p.strip()]
+    if not filepaths:
+        return "Error: No files given"
+    
+    # File reads release the GIL, so a small pool overlaps their I/O waits
+    workers = min(len(filepaths), _BATCH_READ_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        contents = list(executor.map(read_file, filepaths))
+    
+    return "\n\n".join(
+        f"=== {path} ===\n{content}" for path, content in zip(filepaths, contents)
+    )
+
+
 def write_file(filepath: str, content: str) -> str:
     """Write content to a file"""
     try:
@@ -113,8 +366,13 @@ def write_file(filepath: str, content: str) -> str:
         if directory:
             os.makedirs(directory, exist_ok=True)
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        data = memoryview(content.encode("utf-8"))
+        fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
         
         return f"Successfully wrote {len(content)} characters to {filepath}"
     except Exception as e:
@@ -140,25 +398,31 @@ def web_search(query: str) -> str:
     )
 
 
+_LIST_DIRECTORY_LIMIT = 500
+
+
 def list_directory(path: str = ".") -> str:
     """List files and folders in a directory"""
     try:
-        items = os.listdir(path)
-        if not items:
+        # scandir hands back the entry type with the name, so only files
+        # need a stat() call for their size
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+        if not entries:
             return f"Directory '{path}' is empty"
         
         files = []
         dirs = []
-        for item in sorted(items):
-            full = os.path.join(path, item)
-            if os.path.isdir(full):
-                dirs.append(f"  [DIR]  {item}/")
+        for entry in entries[:_LIST_DIRECTORY_LIMIT]:
+            if entry.is_dir():
+                dirs.append(f"  [DIR]  {entry.name}/")
             else:
-                size = os.path.getsize(full)
-                files.append(f"  [FILE] {item} ({size} bytes)")
+                files.append(f"  [FILE] {entry.name} ({entry.stat().st_size} bytes)")
         
         result = f"Contents of '{path}':\n"
         result += "\n".join(dirs + files)
+        if len(entries) > _LIST_DIRECTORY_LIMIT:
+            result += f"\n  ... and {len(entries) - _LIST_DIRECTORY_LIMIT} more entries"
         return result
     except Exception as e:
         return f"Error: {str(e)}"
@@ -167,18 +431,160 @@ def list_directory(path: str = ".") -> str:
 def text_analysis(text: str) -> str:
     """Analyze text - word count, char count, etc."""
     words = text.split()
-    lines = text.split('\n')
+    # count() and map(len) stay in C instead of building a second list
+    # of lines and looping over words in a generator
+    lines = text.count('\n') + 1
     chars = len(text)
     
     return (
         f"Text Analysis:\n"
         f"  Characters: {chars}\n"
         f"  Words: {len(words)}\n"
-        f"  Lines: {len(lines)}\n"
-        f"  Avg word length: {sum(len(w) for w in words) / max(len(words), 1):.1f}"
+        f"  Lines: {lines}\n"
+        f"  Avg word length: {sum(map(len, words)) / max(len(words), 1):.1f}"
     )
 
 
+@functools.lru_cache(maxsize=None)
+def _builtin_tools() -> Tuple[Tool, ...]:
+    """
+    Templates for the built-in tools, built once per process
+    Registries register copies (see _register_builtins), never these
+    """
+    tools = []
+    
+    tools.append(Tool(
+        name="calculator",
+        description="Calculate mathematical expressions. Supports +, -, *, /, sqrt, sin, cos, etc.",
+        parameters={
+            "type": "object",
+            "properties": {
+                "expression": {
+                    "type": "string",
+                    "description": "Math expression to evaluate, e.g., '2 + 2' or 'sqrt(16)'"
+                }
+            },
+            "required": ["expression"]
+        },
+        function=calculator,
+        cacheable=True
+    ))
+    
+    tools.append(Tool(
+        name="read_file",
+        description="Read the contents of a file",
+        parameters={
+            "type": "object",
+            "properties": {
+                "filepath": {
+                    "type": "string",
+                    "description": "Path to the file to read"
+                }
+            },
+            "required": ["filepath"]
+        },
+        function=read_file
+    ))
+    
+    tools.append(Tool(
+        name="write_file",
+        description="Write content to a file",
+        parameters={
+            "type": "object",
+            "properties": {
+                "filepath": {
+                    "type": "string",
+                    "description": "Path to the file to write"
+                },
+                "content": {
+                    "type": "string",
+                    "description": "Content to write to the file"
+                }
+            },
+            "required": ["filepath", "content"]
+        },
+        function=write_file
+    ))
+    
+    tools.append(Tool(
+        name="get_datetime",
+        description="Get current date and time",
+        parameters={
+            "type": "object",
+            "properties": {},
+            "required": []
+        },
+        function=get_datetime
+    ))
+    
+    tools.append(Tool(
+        name="web_search",
+        description="Search the web for information",
+        parameters={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query"
+                }
+            },
+            "required": ["query"]
+        },
+        function=web_search,
+        cacheable=True
+    ))
+    
+    tools.append(Tool(
+        name="list_directory",
+        description="List files and folders in a directory",
+        parameters={
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": "Directory path to list"
+                }
+            },
+            "required": []
+        },
+        function=list_directory
+    ))
+    
+    tools.append(Tool(
+        name="batch_read_files",
+        description="Read several files in one call",
+        parameters={
+            "type": "object",
+            "properties": {
+                "filepaths": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Paths of the files to read"
+                }
+            },
+            "required": ["filepaths"]
+        },
+        function=batch_read_files
+    ))
+    
+    tools.append(Tool(
+        name="text_analysis",
+        description="Analyze text - count words, characters, lines",
+        parameters={
+            "type": "object",
+            "properties": {
+                "text": {
+                    "type": "string",
+                    "description": "Text to analyze"
+                }
+            },
+            "required": ["text"]
+        },
+        function=text_analysis
+    ))
+    return tuple(tools)
+
+
 # ============================================================
 # Tool Registry
 # ============================================================
@@ -186,127 +592,56 @@ def text_analysis(text: str) -> str:
 class ToolRegistry:
     """Manages available tools for agents"""
     
-    def __init__(self):
+    # Tools whose output depends only on their arguments (and, for
+    # read_file, on the file's current stat), so results can be reused.
+    # list_directory is left out: its listing shows entry sizes, which
+    # change without touching the directory's own stat
+    PURE_TOOLS = frozenset({"calculator", "read_file", "text_analysis"})
+    
+    # Tools whose free-text argument can be matched semantically:
+    # a paraphrased search query reuses the earlier results
+    SEMANTIC_TOOLS = {"web_search": "query"}
+    
+    def __init__(self, cache: Optional[Any] = None, semantic_cache: Optional[Any] = None):
+        """
+        cache: optional output cache for pure tools - anything with
+        get(key) / put(key, value), e.g. cache.SQLiteToolCache
+        semantic_cache: optional cache.SemanticCache for SEMANTIC_TOOLS
+        """
         self.tools: Dict[str, Tool] = {}
+        self.cache = cache
+        # Caches like SQLiteToolCache record which tool produced an entry
+        self._cache_takes_name = cache is not None and (
+            "tool_name" in inspect.signature(cache.put).parameters
+        )
+        self.semantic_cache = semantic_cache
+        self.version = 0  # bumped on every change so callers can cache
+        self._descriptions: Dict[str, str] = {}  # per-tool prompt lines
+        self._desc_cache: Optional[str] = None
+        self._names_cache: Optional[Tuple[str, ...]] = None
+        self._fingerprint_cache: Optional[str] = None
+        self._openai_cache: Optional[List[Dict]] = None
+        self._builtins: set = set()
         self._register_builtins()
+        self._builtins = set(self.tools)
     
     def _register_builtins(self):
         """Register all built-in tools"""
-        
-        self.register(Tool(
-            name="calculator",
-            description="Calculate mathematical expressions. Supports +, -, *, /, sqrt, sin, cos, etc.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "expression": {
-                        "type": "string",
-                        "description": "Math expression to evaluate, e.g., '2 + 2' or 'sqrt(16)'"
-                    }
-                },
-                "required": ["expression"]
-            },
-            function=calculator
-        ))
-        
-        self.register(Tool(
-            name="read_file",
-            description="Read the contents of a file",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "filepath": {
-                        "type": "string",
-                        "description": "Path to the file to read"
-                    }
-                },
-                "required": ["filepath"]
-            },
-            function=read_file
-        ))
-        
-        self.register(Tool(
-            name="write_file",
-            description="Write content to a file",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "filepath": {
-                        "type": "string",
-                        "description": "Path to the file to write"
-                    },
-                    "content": {
-                        "type": "string",
-                        "description": "Content to write to the file"
-                    }
-                },
-                "required": ["filepath", "content"]
-            },
-            function=write_file
-        ))
-        
-        self.register(Tool(
-            name="get_datetime",
-            description="Get current date and time",
-            parameters={
-                "type": "object",
-                "properties": {},
-                "required": []
-            },
-            function=get_datetime
-        ))
-        
-        self.register(Tool(
-            name="web_search",
-            description="Search the web for information",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Search query"
-                    }
-                },
-                "required": ["query"]
-            },
-            function=web_search
-        ))
-        
-        self.register(Tool(
-            name="list_directory",
-            description="List files and folders in a directory",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "path": {
-                        "type": "string",
-                        "description": "Directory path to list"
-                    }
-                },
-                "required": []
-            },
-            function=list_directory
-        ))
-        
-        self.register(Tool(
-            name="text_analysis",
-            description="Analyze text - count words, characters, lines",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "text": {
-                        "type": "string",
-                        "description": "Text to analyze"
-                    }
-                },
-                "required": ["text"]
-            },
-            function=text_analysis
-        ))
+        # Fresh copies so one registry can't swap another's function,
+        # and each gets its own output cache from __post_init__
+        for tool in _builtin_tools():
+            self.register(replace(tool))
     
     def register(self, tool: Tool):
         """Register a new tool"""
         self.tools[tool.name] = tool
+        self._builtins.discard(tool.name)  # a replaced builtin is a user tool
+        self._descriptions[tool.name] = self._describe(tool)
+        self._desc_cache = None
+        self._names_cache = None
+        self._fingerprint_cache = None
+        self._openai_cache = None
+        self.version += 1
     
     def get(self, name: str) -> Optional[Tool]:
         """Get a tool by name"""
@@ -314,26 +649,171 @@ class ToolRegistry:
     
     def execute(self, name: str, **kwargs) -> ToolResult:
         """Execute a tool by name"""
-        tool = self.get(name)
-        if not tool:
-            return ToolResult(
-                success=False, 
-                output="", 
-                error=f"Tool '{name}' not found"
-            )
-        return tool.execute(**kwargs)
+        tool = self.tools.get(name)
+        if tool is None:
+            return self._not_found(name)
+        key, query, cached = self._lookup(name, kwargs)
+        if cached is not None:
+            return ToolResult(success=True, output=cached)
+        result = tool.execute(**kwargs)
+        self._cache_result(name, key, query, result)
+        return result
+    
+    async def aexecute(self, name: str, **kwargs) -> ToolResult:
+        """Execute a tool by name without blocking the event loop"""
+        tool = self.tools.get(name)
+        if tool is None:
+            return self._not_found(name)
+        key, query, cached = self._lookup(name, kwargs)
+        if cached is not None:
+            return ToolResult(success=True, output=cached)
+        result = await tool.aexecute(**kwargs)
+        self._cache_result(name, key, query, result)
+        return result
+    
+    def _cache_key(self, name: str, kwargs: Dict[str, Any]) -> Optional[bytes]:
+        """Cache key for a pure tool call, or None when it must not be cached"""
+        if self.cache is None or name not in self.PURE_TOOLS:
+            return None
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(name.encode("utf-8") + b"\0")
+        digest.update(json_dumps(kwargs, sort_keys=True, default=str))
+        # A changed file must miss the cache
+        if name == "read_file":
+            try:
+                st = os.stat(kwargs.get("filepath"))
+            except (OSError, TypeError, ValueError):
+                return None
+            digest.update(f"\0{st.st_mtime_ns}:{st.st_size}:{st.st_ino}".encode())
+        return digest.digest()
+    
+    async def run_batch(
+        self,
+        calls: List[Tuple[str, Dict[str, Any]]],
+        limit: Optional[int] = None
+    ) -> List[ToolResult]:
+        """
+        Run independent tool calls concurrently, results in call order
+        limit caps how many run at once (default: the
+        TOOL_CONCURRENCY_LIMIT environment variable, else unlimited).
+        A call that raises becomes a failed ToolResult; the rest still finish
+        """
+        if limit is None:
+            limit = int(os.environ.get("TOOL_CONCURRENCY_LIMIT", "0") or 0)
+        semaphore = asyncio.Semaphore(limit) if limit > 0 else None
+        
+        async def run_one(name: str, kwargs: Dict[str, Any]) -> ToolResult:
+            if semaphore is None:
+                return await self.aexecute(name, **kwargs)
+            async with semaphore:
+                return await self.aexecute(name, **kwargs)
+        
+        outcomes = await asyncio.gather(
+            *(run_one(name, kwargs or {}) for name, kwargs in calls),
+            return_exceptions=True
+        )
+        return [
+            ToolResult(success=False, output="", error=str(outcome))
+            if isinstance(outcome, BaseException) else outcome
+            for outcome in outcomes
+        ]
+    
+    def _lookup(self, name: str, kwargs: Dict[str, Any]) -> tuple:
+        """Check the exact then the semantic cache: (key, query, cached_output)"""
+        key = self._cache_key(name, kwargs)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return key, None, cached
+        
+        query = None
+        if self.semantic_cache is not None and name in self.SEMANTIC_TOOLS:
+            query = kwargs.get(self.SEMANTIC_TOOLS[name])
+            if isinstance(query, str) and query:
+                cached = self.semantic_cache.get(query, namespace=name)
+                if cached is not None:
+                    return key, query, cached
+            else:
+                query = None
+        return key, query, None
+    
+    def _cache_result(
+        self, name: str, key: Optional[bytes], query: Optional[str], result: ToolResult
+    ):
+        """Store successful outputs in the caches that apply"""
+        if not result.success:
+            return
+        if key is not None:
+            if self._cache_takes_name:
+                self.cache.put(key, result.output, tool_name=name)
+            else:
+                self.cache.put(key, result.output)
+        if query is not None:
+            self.semantic_cache.put(query, result.output, namespace=name)
+    
+    def _not_found(self, name: str) -> ToolResult:
+        """Error result that tells the LLM which tools do exist"""
+        return ToolResult(
+            success=False, 
+            output="", 
+            error=f"Tool '{name}' not found. Available tools: {', '.join(self.list_names())}"
+        )
     
     def list_tools(self) -> List[str]:
         """List all available tool names"""
         return list(self.tools.keys())
     
+    def list_names(self) -> Tuple[str, ...]:
+        """Tool names as a tuple, cached until the next register"""
+        if self._names_cache is None:
+            self._names_cache = tuple(self.tools)
+        return self._names_cache
+    
+    def _prompt_order(self) -> List[str]:
+        """
+        Tool names in prompt order: builtins, then user tools, each by name
+        The builtin block stays a byte-stable prefix when tools are added
+        """
+        return sorted(self.tools, key=lambda name: (name not in self._builtins, name))
+    
     def to_openai_format(self) -> List[Dict]:
-        """Convert all tools to OpenAI format for LLM"""
-        return [tool.to_openai_format() for tool in self.tools.values()]
+        """
+        Convert all tools to OpenAI format for LLM
+        In _prompt_order so the request bytes do not depend on registration
+        order. Built once per register; the same list is returned until
+        then, so treat it as read-only
+        """
+        if self._openai_cache is None:
+            self._openai_cache = [
+                self.tools[name].to_openai_format() for name in self._prompt_order()
+            ]
+        return self._openai_cache
+    
+    @staticmethod
+    def _describe(tool: Tool) -> str:
+        """Render one tool's prompt line, with its parameter names and types"""
+        if tool._params_json:
+            return f"  - {tool.name}: {tool.description}\n    Params: {tool._params_json}"
+        return f"  - {tool.name}: {tool.description}"
     
     def get_tools_description(self) -> str:
-        """Get human-readable description of all tools"""
-        lines = ["Available Tools:"]
-        for name, tool in self.tools.items():
-            lines.append(f"  - {name}: {tool.description}")
-        return "\n".join(lines)
+        """Get human-readable description of all tools (cached until register)"""
+        if self._desc_cache is None:
+            # Builtins then user tools, each sorted, so the prompt bytes depend
+            # only on the tool set - keeps provider prefix caches valid. The
+            # version goes last so adding a tool leaves the builtin block intact
+            self._desc_cache = "\n".join(
+                ["Available Tools:"]
+                + [self._descriptions[name] for name in self._prompt_order()]
+                + [f"  (tools_version: {self.tools_fingerprint[:8]})"]
+            )
+        return self._desc_cache
+    
+    @property
+    def tools_fingerprint(self) -> str:
+        """sha256 of the tool schemas; changes only when the tool set does"""
+        if self._fingerprint_cache is None:
+            self._fingerprint_cache = hashlib.sha256(
+                json_dumps(self.to_openai_format(), sort_keys=True)
+            ).hexdigest()
+        return self._fingerprint_cache
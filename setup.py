@@ -50,9 +50,31 @@ setup(
         "openai": [
             "openai>=1.0.0",
         ],
+        "fast": [
+            "orjson>=3.6",
+        ],
+        "semantic": [
+            "numpy>=1.21",
+            "sentence-transformers>=2.2",
+        ],
+        "jit": [
+            "numba>=0.56",
+        ],
+        "ann": [
+            "faiss-cpu>=1.7",
+        ],
+        "re2": [
+            "google-re2>=1.0",
+        ],
         "all": [
             "openai>=1.0.0",
             "requests>=2.28.0",
+            "orjson>=3.6",
+            "numpy>=1.21",
+            "sentence-transformers>=2.2",
+            "numba>=0.56",
+            "faiss-cpu>=1.7",
+            "google-re2>=1.0",
         ],
     },
     
@@ -0,0 +1,147 @@
+"""
+Tests for the NexaFlow agent
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from nexaflow.agent import Agent
+from nexaflow.llm import LLM, LLMConfig, Message
+from nexaflow.memory import MemoryManager
+
+
+class StubLLM:
+    """LLM stand-in that always finishes"""
+
+    def chat(self, messages, **kwargs):
+        return 'THOUGHT: done\nACTION: FINISH\nACTION_INPUT: {"answer": "42"}'
+
+
+def make_agent():
+    return Agent(llm=StubLLM(), verbose=False)
+
+
+def test_parse_ignores_markers_inside_action_input():
+    response = (
+        'THOUGHT: save it\n'
+        'ACTION: write_file\n'
+        'ACTION_INPUT: {"filepath":"a","content":"ACTION: calculator"}'
+    )
+    step = make_agent()._parse_response(response, 1)
+    assert step.actions == [
+        ("write_file", {"filepath": "a", "content": "ACTION: calculator"})
+    ]
+
+
+def test_invalid_outer_object_is_not_replaced_by_nested_one():
+    response = (
+        'THOUGHT: t\n'
+        'ACTION: calculator\n'
+        'ACTION_INPUT: {"a": {"b": 1}, bad}'
+    )
+    step = make_agent()._parse_response(response, 1)
+    assert step.action_input == {"raw": '{"a": {"b": 1}, bad}'}
+
+
+class MessageLLM:
+    """LLM stand-in that replies with Message objects, like LLM does"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+
+    def chat(self, messages, **kwargs):
+        return Message(role="assistant", content=self.replies.pop(0))
+
+    async def achat(self, messages, **kwargs):
+        return self.chat(messages)
+
+
+CALC_THEN_FINISH = [
+    'THOUGHT: multiply\nACTION: calculator\nACTION_INPUT: {"expression": "6*7"}',
+    'THOUGHT: done\nACTION: FINISH\nACTION_INPUT: {"answer": "42"}',
+]
+
+
+def test_run_unwraps_message_replies(tmp_path):
+    agent = Agent(
+        llm=MessageLLM(CALC_THEN_FINISH),
+        memory=MemoryManager(str(tmp_path)),
+        verbose=False
+    )
+    assert agent.run("What is 6*7?") == "42"
+    assert agent.history[0].observation == "Result: 6*7 = 42"
+
+
+def test_arun_unwraps_message_replies(tmp_path):
+    agent = Agent(
+        llm=MessageLLM(CALC_THEN_FINISH),
+        memory=MemoryManager(str(tmp_path)),
+        verbose=False
+    )
+    assert asyncio.run(agent.arun("What is 6*7?")) == "42"
+    assert agent.history[0].observation == "Result: 6*7 = 42"
+
+
+class FakeStreamClient:
+    """
+    Stands in for an OpenAI-style SDK client with stream=True
+    Each reply is sent in 4-character chunks; after a reply's last chunk
+    the agent's pending early tool call is recorded in seen_pending
+    """
+
+    def __init__(self, replies, agent_ref):
+        self.replies = list(replies)
+        self.agent_ref = agent_ref
+        self.sent = []
+        self.seen_pending = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, stream=False, **kwargs):
+        return self._stream(self.replies.pop(0))
+
+    def _stream(self, reply):
+        chunks = [reply[i:i + 4] for i in range(0, len(reply), 4)]
+        self.sent.append(0)
+        for chunk in chunks:
+            self.sent[-1] += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))])
+        self.seen_pending.append(self.agent_ref[0]._pending_action)
+
+
+def make_streaming_agent(replies, tmp_path):
+    llm = LLM(LLMConfig(provider="mock"))
+    llm.config.provider = "openai"
+    agent_ref = []
+    llm.client = FakeStreamClient(replies, agent_ref)
+    agent = Agent(llm=llm, memory=MemoryManager(str(tmp_path)), verbose=False, stream=True)
+    agent_ref.append(agent)
+    return agent, llm.client
+
+
+def test_stream_stops_once_the_final_answer_is_complete(tmp_path):
+    finish = 'THOUGHT: done\nACTION: FINISH\nACTION_INPUT: {"answer": "42"}'
+    reply = finish + "\nTHOUGHT: more text the model should not be paid for" * 10
+    agent, client = make_streaming_agent([reply], tmp_path)
+    assert agent.run("What is 6*7?") == "42"
+    assert client.sent[0] < len(reply) // 4
+
+
+def test_stream_starts_only_pure_tools_early(tmp_path):
+    target = tmp_path / "out.txt"
+    padding = "\n" + " " * 64
+    replies = [
+        'THOUGHT: save\nACTION: write_file\nACTION_INPUT: '
+        + json.dumps({"filepath": str(target), "content": "hi"}) + padding,
+        'THOUGHT: multiply\nACTION: calculator\nACTION_INPUT: {"expression": "6*7"}' + padding,
+        'THOUGHT: done\nACTION: FINISH\nACTION_INPUT: {"answer": "42"}',
+    ]
+    agent, client = make_streaming_agent(replies, tmp_path)
+    assert agent.run("Save hi, then compute 6*7") == "42"
+
+    write_action, write_future = client.seen_pending[0]
+    assert write_action[0] == "write_file" and write_future is None
+    calc_action, calc_future = client.seen_pending[1]
+    assert calc_action[0] == "calculator" and calc_future is not None
+    assert target.read_text() == "hi"
+    assert agent.history[1].observation == "Result: 6*7 = 42"
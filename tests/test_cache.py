@@ -0,0 +1,22 @@
+"""
+Tests for the NexaFlow caches
+"""
+
+from nexaflow.cache import SemanticCache
+from nexaflow.embeddings import Embedder
+
+
+class HashedEmbedder(Embedder):
+    """The bag-of-words fallback, whether or not a model is installed"""
+
+    semantic = False
+
+    def encode(self, text):
+        return self._hash_encode(text)
+
+
+def test_hashed_fallback_only_reuses_exact_queries():
+    cache = SemanticCache(embedder=HashedEmbedder())
+    cache.put("What is 1234 * 5678? Show the result.", "7006652")
+    assert cache.get("What is 1234 * 5679? Show the result.") is None
+    assert cache.get("  what is 1234 * 5678?   Show the result.") == "7006652"
@@ -0,0 +1,33 @@
+"""
+Tests for the NexaFlow tools
+"""
+
+from nexaflow.tools import calculator
+
+
+def test_calculator_accepts_sequence_literals():
+    assert calculator("sum([1, 2, 3])") == "sum([1, 2, 3]) = 6"
+    assert calculator("max([1, 2])") == "max([1, 2]) = 2"
+    assert calculator("min((4, 5))") == "min((4, 5)) = 4"
+
+
+def test_calculator_rejects_non_numeric_items():
+    assert calculator("sum(['a'])").startswith("Error")
+
+
+def test_calculator_rejects_huge_powers():
+    assert "too large" in calculator("(10**9999)**9999")
+    assert "too large" in calculator("pow(2, 10**7)")
+    assert calculator("2**100") == "2**100 = 1267650600228229401496703205376"
+    assert calculator("pow(2, 10**7, 7)") == "pow(2, 10**7, 7) = 2"
+
+
+def test_calculator_reports_overly_nested_input():
+    assert calculator("-" * 5000 + "1").startswith("Calculation error: ")
+    assert calculator("(" * 500 + "1" + ")" * 500).startswith("Calculation error: ")
+
+
+def test_calculator_allows_sequences_only_as_function_arguments():
+    assert calculator("[1] * 10**9") == "Error: 'List' is not allowed"
+    assert calculator("sum([1] * 10**9)") == "Error: 'List' is not allowed"
+    assert calculator("sqrt([4])") == "Error: 'List' is not allowed"